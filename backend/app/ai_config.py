@@ -25,6 +25,13 @@ logger = logging.getLogger("sanctum.ai_config")
 
 router = APIRouter(prefix="/admin/ai-config", tags=["ai-config"])
 
+# Database category -> response group key
+AI_CONFIG_GROUPS = {
+    "prompt_section": "prompt_sections",
+    "parameter": "parameters",
+    "default": "defaults",
+}
+
 
 def _config_to_item(config: dict) -> AIConfigItem:
     """Convert database row to AIConfigItem"""
@@ -62,13 +69,9 @@ async def get_ai_config(admin: dict = Depends(auth.require_admin)):
 
     response = AIConfigResponse()
     for config in all_config:
-        item = _config_to_item(config)
-        if config["category"] == "prompt_section":
-            response.prompt_sections.append(item)
-        elif config["category"] == "parameter":
-            response.parameters.append(item)
-        elif config["category"] == "default":
-            response.defaults.append(item)
+        group = AI_CONFIG_GROUPS.get(config["category"])
+        if group:
+            response.categories.setdefault(group, []).append(_config_to_item(config))
 
     return response
 
@@ -202,13 +205,9 @@ async def get_ai_config_for_user_type(
     )
 
     for config in effective_config:
-        item = _config_to_inheritance_item(config)
-        if config["category"] == "prompt_section":
-            response.prompt_sections.append(item)
-        elif config["category"] == "parameter":
-            response.parameters.append(item)
-        elif config["category"] == "default":
-            response.defaults.append(item)
+        group = AI_CONFIG_GROUPS.get(config["category"])
+        if group:
+            response.categories.setdefault(group, []).append(_config_to_inheritance_item(config))
 
     return response
 
@@ -357,16 +356,6 @@ async def preview_prompt_for_user_type(
     parts = []
     sections_used = list(prompt_sections.keys())
 
-    # Known facts section
-    if request.sample_facts:
-        facts_lines = [f"  - {k}: {v}" for k, v in request.sample_facts.items() if v]
-        if facts_lines:
-            parts.append("=== CONFIRMED FACTS (do NOT re-ask these) ===")
-            parts.append("\n".join(facts_lines))
-        else:
-            parts.append("=== NO FACTS CONFIRMED YET ===")
-            parts.append("Ask about location and context early, but only once per conversation.")
-
     # Tone section
     if prompt_sections.get("prompt_tone"):
         parts.append("")
@@ -390,6 +379,17 @@ async def preview_prompt_for_user_type(
         for topic in forbidden:
             parts.append(f"- {topic}")
 
+    # Known facts section (after the static sections, as in the live prompt)
+    if request.sample_facts:
+        facts_lines = [f"  - {k}: {v}" for k, v in request.sample_facts.items() if v]
+        parts.append("")
+        if facts_lines:
+            parts.append("=== CONFIRMED FACTS (do NOT re-ask these) ===")
+            parts.append("\n".join(facts_lines))
+        else:
+            parts.append("=== NO FACTS CONFIRMED YET ===")
+            parts.append("Ask about location and context early, but only once per conversation.")
+
     # Question
     parts.append("")
     parts.append("=== QUESTION ===")
@@ -443,16 +443,6 @@ async def preview_prompt(
     # Build the assembled prompt
     parts = []
 
-    # Known facts section
-    if request.sample_facts:
-        facts_lines = [f"  - {k}: {v}" for k, v in request.sample_facts.items() if v]
-        if facts_lines:
-            parts.append("=== CONFIRMED FACTS (do NOT re-ask these) ===")
-            parts.append("\n".join(facts_lines))
-        else:
-            parts.append("=== NO FACTS CONFIRMED YET ===")
-            parts.append("Ask about location and context early, but only once per conversation.")
-
     # Tone section
     if sections.get("prompt_tone"):
         parts.append("")
@@ -476,6 +466,17 @@ async def preview_prompt(
         for topic in forbidden:
             parts.append(f"- {topic}")
 
+    # Known facts section (after the static sections, as in the live prompt)
+    if request.sample_facts:
+        facts_lines = [f"  - {k}: {v}" for k, v in request.sample_facts.items() if v]
+        parts.append("")
+        if facts_lines:
+            parts.append("=== CONFIRMED FACTS (do NOT re-ask these) ===")
+            parts.append("\n".join(facts_lines))
+        else:
+            parts.append("=== NO FACTS CONFIRMED YET ===")
+            parts.append("Ask about location and context early, but only once per conversation.")
+
     # Question
     parts.append("")
     parts.append("=== QUESTION ===")
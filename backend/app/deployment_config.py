@@ -106,6 +106,9 @@ ENV_CONFIG_MAP = {
     "MONITORING_URL": {"category": "general", "description": "Health monitoring endpoint URL", "requires_restart": False, "default": "http://localhost:8000/health"},
 }
 
+# Categories returned by GET /config; anything else is grouped under "general"
+DEPLOYMENT_CATEGORIES = ("llm", "embedding", "email", "storage", "security", "search", "domains", "ssl", "general")
+
 # Keys that should never be exposed or editable
 FORBIDDEN_KEYS = {"SECRET_KEY", "DATABASE_URL", "ADMIN_PRIVATE_KEY"}
 
@@ -228,27 +231,10 @@ async def get_deployment_config(admin: dict = Depends(auth.require_admin)):
 
     response = DeploymentConfigResponse()
     for config in all_config:
-        item = _config_to_item(config)
         category = config["category"]
-
-        if category == "llm":
-            response.llm.append(item)
-        elif category == "embedding":
-            response.embedding.append(item)
-        elif category == "email":
-            response.email.append(item)
-        elif category == "storage":
-            response.storage.append(item)
-        elif category == "security":
-            response.security.append(item)
-        elif category == "search":
-            response.search.append(item)
-        elif category == "domains":
-            response.domains.append(item)
-        elif category == "ssl":
-            response.ssl.append(item)
-        else:
-            response.general.append(item)
+        if category not in DEPLOYMENT_CATEGORIES:
+            category = "general"
+        response.categories.setdefault(category, []).append(_config_to_item(config))
 
     return response
 
@@ -51,7 +51,7 @@ MAX_CONCURRENT_CHUNKS = int(os.getenv("MAX_CONCURRENT_CHUNKS", "3"))
 UPLOAD_RATE_LIMIT_PER_MINUTE = int(os.getenv("RATE_LIMIT_UPLOAD_PER_MINUTE", "20"))
 
 # Valid ontology IDs for document extraction
-VALID_ONTOLOGIES = {"general", "bitcoin"}
+VALID_ONTOLOGIES = frozenset({"general", "bitcoin"})
 
 # Configuration
 UPLOADS_DIR = Path(os.getenv("UPLOADS_DIR", "/uploads"))
@@ -480,7 +480,7 @@ async def wipe_datastores(admin: dict = Depends(auth.require_admin)):
 
     # Qdrant: delete collections if they exist
     try:
-        from store import get_qdrant_client, COLLECTION_NAME
+        from store import get_qdrant_client, invalidate_index, COLLECTION_NAME
         client = get_qdrant_client()
         collections = {c.name for c in client.get_collections().collections}
         deleted = []
@@ -488,6 +488,8 @@ async def wipe_datastores(admin: dict = Depends(auth.require_admin)):
             if name in collections:
                 client.delete_collection(name)
                 deleted.append(name)
+        if COLLECTION_NAME in deleted:
+            invalidate_index()
         result["qdrant"] = {"status": "ok", "deleted_collections": deleted}
         logger.info(f"Qdrant wipe complete: {deleted}")
     except Exception as e:
@@ -529,13 +531,17 @@ async def get_datastore_stats(admin: dict = Depends(auth.require_admin)):
     return stats
 
 
+# VALID_ONTOLOGIES is fixed at import time, so the listing is built once
+_ONTOLOGIES_RESPONSE = OntologiesResponse(
+    ontologies=sorted(VALID_ONTOLOGIES),
+    default="general",
+)
+
+
 @router.get("/ontologies", response_model=OntologiesResponse)
 async def list_ontologies() -> OntologiesResponse:
     """List valid ontology IDs for document extraction."""
-    return OntologiesResponse(
-        ontologies=sorted(VALID_ONTOLOGIES),
-        default="general",
-    )
+    return _ONTOLOGIES_RESPONSE
 
 
 @router.post("/upload", response_model=UploadResponse)
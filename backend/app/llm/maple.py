@@ -7,11 +7,11 @@ IMPORTANT: Maple Proxy only supports streaming responses.
 
 import os
 import threading
-from typing import Optional
+from typing import Iterator, Optional
 import httpx
 from openai import OpenAI
 
-from .provider import LLMProvider, LLMResponse
+from .provider import LLMProvider, LLMResponse, json_schema_response_format
 
 
 class MapleProvider(LLMProvider):
@@ -99,19 +99,36 @@ class MapleProvider(LLMProvider):
             client = self.client
             model = model or self.default_model
 
-        # Must use streaming for Maple
-        stream = client.chat.completions.create(
+        # Collect streamed chunks
+        content_parts = list(self._stream_deltas(client, model, prompt, temperature))
+
+        return LLMResponse(
+            content="".join(content_parts),
             model=model,
-            messages=[{"role": "user", "content": prompt}],
-            stream=True,
-            temperature=temperature,
+            provider=self.name,
+            usage=None  # Streaming doesn't provide usage stats
         )
 
-        # Collect streamed chunks
-        content_parts = []
-        for chunk in stream:
-            if chunk.choices and chunk.choices[0].delta.content:
-                content_parts.append(chunk.choices[0].delta.content)
+    def complete_json(
+        self,
+        prompt: str,
+        schema: dict,
+        model: Optional[str] = None,
+        temperature: float = 0.1,
+    ) -> LLMResponse:
+        """Generate a completion constrained to a JSON schema (collected from the stream)."""
+        # Refresh config before each request to pick up runtime changes
+        self._refresh_config()
+
+        # Capture references under lock to avoid race conditions
+        with self._lock:
+            client = self.client
+            model = model or self.default_model
+
+        content_parts = list(self._stream_deltas(
+            client, model, prompt, temperature,
+            response_format=json_schema_response_format(schema),
+        ))
 
         return LLMResponse(
             content="".join(content_parts),
@@ -119,3 +136,38 @@ class MapleProvider(LLMProvider):
             provider=self.name,
             usage=None  # Streaming doesn't provide usage stats
         )
+
+    def stream(self, prompt: str, model: Optional[str] = None, temperature: float = 0.1) -> Iterator[str]:
+        """Yield content deltas from Maple Proxy as they arrive."""
+        # Refresh config before each request to pick up runtime changes
+        self._refresh_config()
+
+        # Capture references under lock to avoid race conditions
+        with self._lock:
+            client = self.client
+            model = model or self.default_model
+
+        yield from self._stream_deltas(client, model, prompt, temperature)
+
+    @staticmethod
+    def _stream_deltas(
+        client: OpenAI,
+        model: str,
+        prompt: str,
+        temperature: float,
+        response_format: Optional[dict] = None,
+    ) -> Iterator[str]:
+        """Issue a streaming chat completion and yield non-empty content deltas."""
+        extra = {"response_format": response_format} if response_format else {}
+        # Must use streaming for Maple
+        stream = client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            stream=True,
+            temperature=temperature,
+            **extra,
+        )
+
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
@@ -6,11 +6,11 @@ OpenAI-compatible provider for local Ollama inference.
 
 import os
 import threading
-from typing import Optional
+from typing import Iterator, Optional
 import httpx
 from openai import OpenAI
 
-from .provider import LLMProvider, LLMResponse
+from .provider import LLMProvider, LLMResponse, json_schema_response_format
 
 
 class OllamaProvider(LLMProvider):
@@ -80,6 +80,28 @@ class OllamaProvider(LLMProvider):
 
     def complete(self, prompt: str, model: Optional[str] = None, temperature: float = 0.1, timeout: float = 120.0) -> LLMResponse:
         """Generate completion using Ollama (supports non-streaming)"""
+        return self._complete(prompt, model, temperature, timeout)
+
+    def complete_json(
+        self,
+        prompt: str,
+        schema: dict,
+        model: Optional[str] = None,
+        temperature: float = 0.1,
+        timeout: float = 120.0,
+    ) -> LLMResponse:
+        """Generate a completion constrained to a JSON schema (Ollama structured outputs)"""
+        return self._complete(prompt, model, temperature, timeout, response_format=json_schema_response_format(schema))
+
+    def _complete(
+        self,
+        prompt: str,
+        model: Optional[str],
+        temperature: float,
+        timeout: float,
+        response_format: Optional[dict] = None,
+    ) -> LLMResponse:
+        """Non-streaming chat completion, optionally with a response_format"""
         # Refresh config before each request to pick up runtime changes
         self._refresh_config()
 
@@ -88,11 +110,13 @@ class OllamaProvider(LLMProvider):
             client = self.client
             model = model or self.default_model
 
+        extra = {"response_format": response_format} if response_format else {}
         response = client.with_options(timeout=timeout).chat.completions.create(
             model=model,
             messages=[{"role": "user", "content": prompt}],
             temperature=temperature,
-            stream=False
+            stream=False,
+            **extra,
         )
 
         usage = None
@@ -108,3 +132,24 @@ class OllamaProvider(LLMProvider):
             provider=self.name,
             usage=usage
         )
+
+    def stream(self, prompt: str, model: Optional[str] = None, temperature: float = 0.1, timeout: float = 120.0) -> Iterator[str]:
+        """Yield content deltas from Ollama's streaming completion."""
+        # Refresh config before each request to pick up runtime changes
+        self._refresh_config()
+
+        # Capture references under lock to avoid race conditions
+        with self._lock:
+            client = self.client
+            model = model or self.default_model
+
+        stream = client.with_options(timeout=timeout).chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            stream=True
+        )
+
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
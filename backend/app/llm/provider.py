@@ -5,9 +5,10 @@ Provides an abstract interface for OpenAI-compatible LLM providers.
 """
 
 import os
+import threading
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Optional
+from typing import Iterator, Optional
 
 
 @dataclass
@@ -38,6 +39,35 @@ class LLMProvider(ABC):
         """Generate a completion from the given prompt"""
         pass
 
+    def complete_json(
+        self,
+        prompt: str,
+        schema: dict,
+        model: Optional[str] = None,
+        temperature: float = 0.1,
+    ) -> LLMResponse:
+        """
+        Generate a completion constrained to a JSON schema where the backend supports it.
+        Default implementation relies on the prompt's format instructions alone.
+        """
+        return self.complete(prompt, model=model, temperature=temperature)
+
+    def stream(self, prompt: str, model: Optional[str] = None, temperature: float = 0.1) -> Iterator[str]:
+        """
+        Yield completion text incrementally as it is generated.
+        Default implementation yields the full completion at once.
+        """
+        yield self.complete(prompt, model=model, temperature=temperature).content
+
+
+def json_schema_response_format(schema: dict, name: str = "response") -> dict:
+    """OpenAI-compatible response_format requesting output that matches a JSON schema."""
+    return {"type": "json_schema", "json_schema": {"name": name, "schema": schema}}
+
+
+_providers: dict[str, LLMProvider] = {}
+_providers_lock = threading.Lock()
+
 
 def get_provider(provider_name: Optional[str] = None) -> LLMProvider:
     """
@@ -54,11 +84,22 @@ def get_provider(provider_name: Optional[str] = None) -> LLMProvider:
     """
     name = provider_name or os.getenv("LLM_PROVIDER", "maple")
 
-    if name == "maple":
-        from .maple import MapleProvider
-        return MapleProvider()
-    elif name == "ollama":
-        from .ollama import OllamaProvider
-        return OllamaProvider()
-    else:
-        raise ValueError(f"Unknown LLM provider: {name}")
+    # Providers refresh their config on every call, so one instance per name
+    # keeps the HTTP client (and its pooled connections) across requests
+    provider = _providers.get(name)
+    if provider is not None:
+        return provider
+
+    with _providers_lock:
+        provider = _providers.get(name)
+        if provider is None:
+            if name == "maple":
+                from .maple import MapleProvider
+                provider = MapleProvider()
+            elif name == "ollama":
+                from .ollama import OllamaProvider
+                provider = OllamaProvider()
+            else:
+                raise ValueError(f"Unknown LLM provider: {name}")
+            _providers[name] = provider
+    return provider
@@ -56,7 +56,7 @@ from models import (
     # Reachout
     ReachoutRequest, ReachoutResponse,
 )
-from nostr import verify_auth_event, get_pubkey_from_event
+from nostr import event_to_dict, verify_auth_event, get_pubkey_from_event
 import auth
 from rate_limit import RateLimiter
 from rate_limit_key import rate_limit_key as _stable_rate_limit_key
@@ -1620,7 +1620,10 @@ async def admin_auth(
     Rate limited to 10 requests per minute per IP.
     """
     # Convert Pydantic model to dict for verification
-    event = body.event.model_dump()
+    try:
+        event = event_to_dict(body.event)
+    except ValueError as e:
+        raise HTTPException(status_code=401, detail=str(e))
 
     # Verify the signed event
     valid, error = verify_auth_event(event)
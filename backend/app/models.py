@@ -434,10 +434,8 @@ class AIConfigItem(BaseModel):
 
 
 class AIConfigResponse(BaseModel):
-    """Response model for AI config grouped by category"""
-    prompt_sections: list[AIConfigItem] = []
-    parameters: list[AIConfigItem] = []
-    defaults: list[AIConfigItem] = []
+    """Response model for AI config grouped by category (prompt_sections, parameters, defaults)"""
+    categories: dict[str, list[AIConfigItem]] = Field(default_factory=dict)
 
 
 class AIConfigUpdate(BaseModel):
@@ -489,9 +487,7 @@ class AIConfigUserTypeResponse(BaseModel):
     """Response model for AI config with user-type inheritance"""
     user_type_id: int
     user_type_name: Optional[str] = None
-    prompt_sections: list[AIConfigWithInheritance] = []
-    parameters: list[AIConfigWithInheritance] = []
-    defaults: list[AIConfigWithInheritance] = []
+    categories: dict[str, list[AIConfigWithInheritance]] = Field(default_factory=dict)
 
 
 class AIConfigOverrideUpdate(BaseModel):
@@ -582,16 +578,8 @@ class DeploymentConfigItem(BaseModel):
 
 
 class DeploymentConfigResponse(BaseModel):
-    """Response model for deployment config grouped by category"""
-    llm: list[DeploymentConfigItem] = []
-    embedding: list[DeploymentConfigItem] = []
-    email: list[DeploymentConfigItem] = []
-    storage: list[DeploymentConfigItem] = []
-    security: list[DeploymentConfigItem] = []
-    search: list[DeploymentConfigItem] = []
-    domains: list[DeploymentConfigItem] = []
-    ssl: list[DeploymentConfigItem] = []
-    general: list[DeploymentConfigItem] = []
+    """Response model for deployment config grouped by category (llm, embedding, ..., general)"""
+    categories: dict[str, list[DeploymentConfigItem]] = Field(default_factory=dict)
 
 
 class DeploymentConfigUpdate(BaseModel):
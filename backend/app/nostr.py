@@ -5,9 +5,10 @@ Implements BIP-340 Schnorr signature verification for Nostr events.
 
 import hashlib
 import json
+import re
 import time
 import logging
-from typing import Tuple
+from typing import Any
 
 from coincurve import PublicKeyXOnly
 
@@ -19,8 +20,46 @@ AUTH_EVENT_KIND = 22242
 # Maximum age for auth events (5 minutes)
 MAX_EVENT_AGE_SECONDS = 300
 
+# Maximum tolerated client clock skew for events dated in the future
+MAX_EVENT_FUTURE_SKEW_SECONDS = 5
 
-def compute_event_id(event: dict) -> str:
+_HEX64_RE = re.compile(r"[0-9a-f]{64}")
+_HEX128_RE = re.compile(r"[0-9a-f]{128}")
+
+
+def event_to_dict(event: Any) -> dict[str, Any]:
+    """
+    Build the plain event dict used by the verification helpers.
+
+    Accepts an already-validated NostrEvent model (or any object with the
+    NIP-01 attributes) and copies the seven fields directly, which is cheaper
+    than model_dump() on the auth hot path. id/pubkey/sig shapes are checked
+    up front so malformed events are rejected before hashing.
+
+    Raises:
+        ValueError: if id, pubkey, or sig are not lowercase hex of the expected length
+    """
+    event_id = event.id
+    pubkey = event.pubkey
+    sig = event.sig
+    if not _HEX64_RE.fullmatch(event_id):
+        raise ValueError("Invalid event id")
+    if not _HEX64_RE.fullmatch(pubkey):
+        raise ValueError("Invalid event pubkey")
+    if not _HEX128_RE.fullmatch(sig):
+        raise ValueError("Invalid event signature")
+    return {
+        "id": event_id,
+        "pubkey": pubkey,
+        "created_at": int(event.created_at),
+        "kind": int(event.kind),
+        "tags": event.tags,
+        "content": event.content,
+        "sig": sig,
+    }
+
+
+def compute_event_id(event: dict[str, Any]) -> str:
     """
     Compute the event ID (sha256 of serialized event).
 
@@ -39,7 +78,7 @@ def compute_event_id(event: dict) -> str:
     return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
 
 
-def verify_event_signature(event: dict) -> bool:
+def verify_event_signature(event: dict[str, Any]) -> bool:
     """
     Verify a Nostr event signature using BIP-340 Schnorr.
 
@@ -73,20 +112,21 @@ def verify_event_signature(event: dict) -> bool:
 
         # 5. Verify using coincurve's x-only pubkey (BIP-340 Schnorr)
         pubkey = PublicKeyXOnly(pubkey_bytes)
-        return pubkey.verify(sig_bytes, msg_bytes)
+        return bool(pubkey.verify(sig_bytes, msg_bytes))
 
     except Exception as e:
         logger.error(f"Signature verification error: {e}")
         return False
 
 
-def verify_auth_event(event: dict) -> Tuple[bool, str]:
+def verify_auth_event(event: dict[str, Any]) -> tuple[bool, str]:
     """
     Verify a Sanctum admin auth event.
 
     Checks:
     1. Event kind is AUTH_EVENT_KIND (22242)
-    2. Timestamp is within MAX_EVENT_AGE_SECONDS
+    2. Timestamp is at most MAX_EVENT_AGE_SECONDS old and not in the future
+       (beyond MAX_EVENT_FUTURE_SKEW_SECONDS)
     3. Has valid action tag
     4. Signature is valid
 
@@ -100,16 +140,16 @@ def verify_auth_event(event: dict) -> Tuple[bool, str]:
     if event.get("kind") != AUTH_EVENT_KIND:
         return False, f"Invalid event kind: expected {AUTH_EVENT_KIND}, got {event.get('kind')}"
 
-    # 2. Check timestamp (allow MAX_EVENT_AGE_SECONDS window)
-    now = int(time.time())
-    created_at = event.get("created_at", 0)
-    age = abs(now - created_at)
-    if age > MAX_EVENT_AGE_SECONDS:
+    # 2. Check timestamp (allow MAX_EVENT_AGE_SECONDS in the past, small skew in the future)
+    now = time.time_ns() // 1_000_000_000
+    created_at: int = event.get("created_at", 0)
+    age = now - created_at
+    if age < -MAX_EVENT_FUTURE_SKEW_SECONDS or age > MAX_EVENT_AGE_SECONDS:
         return False, f"Event timestamp out of range: {age}s old (max {MAX_EVENT_AGE_SECONDS}s)"
 
     # 3. Check required tags
-    tags = event.get("tags", [])
-    action_tag = None
+    tags: list[list[str]] = event.get("tags", [])
+    action_tag: str | None = None
 
     for tag in tags:
         if len(tag) >= 2 and tag[0] == "action":
@@ -126,6 +166,6 @@ def verify_auth_event(event: dict) -> Tuple[bool, str]:
     return True, ""
 
 
-def get_pubkey_from_event(event: dict) -> str:
+def get_pubkey_from_event(event: dict[str, Any]) -> str:
     """Extract the pubkey from a verified event."""
-    return event.get("pubkey", "")
+    return str(event.get("pubkey", ""))
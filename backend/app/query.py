@@ -12,26 +12,38 @@ Key principles:
 
 import os
 import re
+import asyncio
+import hashlib
 import logging
+import threading
+import time
 import uuid
-from typing import Optional
-from datetime import datetime
+from collections import OrderedDict
+from functools import lru_cache, partial
+from typing import AsyncIterator, Optional
 from fastapi import APIRouter, HTTPException, Depends, Request
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
 
-import httpx
+import numpy as np
+import orjson
 
 import auth
+from qdrant_client import models as qdrant_models
+
 from store import (
-    embed_texts,
+    encode_texts,
+    get_async_qdrant_client,
+    close_async_qdrant_client,
+    get_index_version,
     COLLECTION_NAME,
-    QDRANT_HOST,
-    QDRANT_PORT,
 )
 from llm import get_provider
 from utils import sanitize_profile_value
 from rate_limit import RateLimiter
 from rate_limit_key import rate_limit_key as _stable_rate_limit_key
+from session_store import InMemorySessionStore, RedisSessionStore
+from retrieval_cache import SemanticRetrievalCache
 
 logger = logging.getLogger("sanctum.query")
 
@@ -42,9 +54,172 @@ router = APIRouter(prefix="/query", tags=["query"])
 TOP_K_VECTORS = int(os.getenv("RAG_TOP_K", "8"))  # More context for nuance
 GRAPH_HOPS = int(os.getenv("RAG_GRAPH_HOPS", "2"))
 QUERY_RATE_LIMIT_PER_MINUTE = int(os.getenv("RATE_LIMIT_QUERY_PER_MINUTE", "90"))
+QUERY_EMBED_CACHE_SIZE = int(os.getenv("RAG_QUERY_EMBED_CACHE_SIZE", "2048"))
+EMBED_BATCH_MAX = 16  # Max queries encoded in one model call
+EMBED_BATCH_WINDOW_SECONDS = 0.01  # How long to wait for more queries to join a batch
+SESSION_MAX_COUNT = int(os.getenv("RAG_SESSION_MAX_COUNT", "10000"))
+SESSION_TTL_SECONDS = int(os.getenv("RAG_SESSION_TTL_SECONDS", "3600"))
+SESSION_REDIS_URL = os.getenv("RAG_SESSION_REDIS_URL", "")  # Empty = in-memory sessions
+SESSION_REDIS_TIMEOUT_SECONDS = float(os.getenv("RAG_SESSION_REDIS_TIMEOUT_SECONDS", "2"))
+# One JSON call returns answer + facts (skips the separate extraction call); needs
+# a model/backend with JSON-schema structured output. Non-streaming /query only.
+STRUCTURED_OUTPUT = os.getenv("RAG_STRUCTURED_OUTPUT", "false").strip().lower() == "true"
+SESSION_MAX_MESSAGES = int(os.getenv("RAG_SESSION_MAX_MESSAGES", "20"))  # Older turns fold into a summary
+# A re-sent question (same text as the previous turn) gets the previous answer back
+SESSION_DEDUPE = os.getenv("RAG_SESSION_DEDUPE", "false").strip().lower() == "true"
+ANSWER_CACHE_SIZE = int(os.getenv("RAG_ANSWER_CACHE_SIZE", "1024"))  # 0 disables the answer cache
+ANSWER_CACHE_TTL_SECONDS = int(os.getenv("RAG_ANSWER_CACHE_TTL_SECONDS", "300"))
+RETRIEVAL_CACHE_SIZE = int(os.getenv("RAG_RETRIEVAL_CACHE_SIZE", "1024"))  # 0 disables the retrieval cache
+RETRIEVAL_CACHE_THRESHOLD = float(os.getenv("RAG_RETRIEVAL_CACHE_THRESHOLD", "0.95"))  # Min cosine similarity
+RETRIEVAL_CACHE_TTL_SECONDS = int(os.getenv("RAG_RETRIEVAL_CACHE_TTL_SECONDS", "300"))
+SEARCH_HNSW_EF = int(os.getenv("RAG_SEARCH_HNSW_EF", "128"))
+SEARCH_OVERSAMPLING = float(os.getenv("RAG_SEARCH_OVERSAMPLING", "2.0"))
+RRF_K = 60  # Reciprocal-rank fusion damping constant for multi-query search
+SITUATION_TAIL_CHARS = 500  # Recent situation details appended to search queries
+HISTORY_MESSAGE_CHARS = 300  # Per-message cap in the prompt's conversation section
+CONTEXT_MAX_PASSAGES = 6  # Retrieved chunks included in the LLM context
+CONTEXT_PASSAGE_CHARS = 800  # Per-chunk cap in the LLM context
+# Payload fields read from search hits (skips job_id and any future bulky fields)
+_SEARCH_PAYLOAD = qdrant_models.PayloadSelectorInclude(include=[
+    "type", "text", "fact_text", "chunk_id", "source_file",
+])
+
+# Precompiled patterns for LLM output parsing and debug-prompt redaction
+_SEARCH_TAG_RE = re.compile(r'\s*\[SEARCH:\s*([^\]]+)\]\s*')
+_FACTS_TAG_RE = re.compile(r'\[FACTS:\s*([^\]]+)\]')
+_FACTS_STRIP_RE = re.compile(r'\s*\[FACTS:[^\]]*\]\s*')
+_JSON_BLOCK_RE = re.compile(r'```(?:json)?\s*(\{.*?\})\s*```', re.DOTALL)
+_NON_WORD_RE = re.compile(r'[^\w\s]')
+_PROFILE_SECTION_RE = re.compile(r'^=== USER PROFILE ===.*?(?=^===|\Z)', re.MULTILINE | re.DOTALL)
+
+# Replies that carry no facts. yes/no are left out: they may answer a clarifying question.
+_ACKNOWLEDGEMENTS = frozenset({
+    "ok", "okay", "k", "thanks", "thank you", "thx", "ty", "got it",
+    "cool", "great", "nice", "alright", "sounds good", "understood",
+})
+
+# Qdrant search params: rescore oversampled quantized candidates with full vectors
+# (the quantization block is ignored by collections created without quantization)
+_SEARCH_PARAMS = qdrant_models.SearchParams(
+    hnsw_ef=SEARCH_HNSW_EF,
+    quantization=qdrant_models.QuantizationSearchParams(rescore=True, oversampling=SEARCH_OVERSAMPLING),
+)
+
+# Session store: Redis when configured (shared across workers), else bounded in-memory
+if SESSION_REDIS_URL:
+    _session_store = RedisSessionStore(
+        SESSION_REDIS_URL,
+        ttl_seconds=SESSION_TTL_SECONDS,
+        timeout_seconds=SESSION_REDIS_TIMEOUT_SECONDS,
+    )
+else:
+    _session_store = InMemorySessionStore(
+        max_sessions=SESSION_MAX_COUNT,
+        ttl_seconds=SESSION_TTL_SECONDS,
+    )
+
+# Query embedding cache (normalized query text -> float32 vector, LRU order)
+_embed_cache: OrderedDict[str, np.ndarray] = OrderedDict()
+
+# Recent search hits by query vector, reused for near-duplicate queries in the same access scope
+_retrieval_cache = SemanticRetrievalCache(
+    max_entries=RETRIEVAL_CACHE_SIZE,
+    threshold=RETRIEVAL_CACHE_THRESHOLD,
+    ttl_seconds=RETRIEVAL_CACHE_TTL_SECONDS,
+)
+
+# Background post-answer session updates (fact extraction, history summary), by session id
+_session_updates: dict[str, asyncio.Task] = {}
+
+# First-turn answer cache: key -> (expires monotonic time, answer tuple), LRU order
+_answer_cache: OrderedDict[str, tuple[float, tuple]] = OrderedDict()
+
+# Last formatted UTC second for message timestamps: (epoch second, "YYYY-MM-DDTHH:MM:SS")
+_iso_second: tuple[int, str] = (-1, "")
+
+# Micro-batching: concurrent queries are queued and encoded together
+_embed_queue: Optional[asyncio.Queue] = None
+_embed_worker: Optional[asyncio.Task] = None
+
+
+async def _embed_batch_worker(queue: asyncio.Queue) -> None:
+    """Drain queued query texts in small batches and encode each batch in one model call."""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + EMBED_BATCH_WINDOW_SECONDS
+        while len(batch) < EMBED_BATCH_MAX:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        try:
+            embeddings = await asyncio.to_thread(encode_texts, [text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            continue
+
+        for (_, future), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(embedding.copy())  # Detach from the batch array
+
+
+async def _embed_query(search_query: str) -> np.ndarray:
+    """
+    Embed a search query, using the LRU cache and batching concurrent misses.
+    The returned vector is shared with the cache and must not be mutated.
+    """
+    global _embed_queue, _embed_worker
+    text = "query: " + " ".join(search_query.split())
+
+    cached = _embed_cache.get(text)
+    if cached is not None:
+        _embed_cache.move_to_end(text)
+        return cached
 
-# Simple in-memory session store (replace with Redis/DB for production)
-_sessions: dict[str, dict] = {}
+    if _embed_worker is None or _embed_worker.done():
+        _embed_queue = asyncio.Queue()
+        _embed_worker = asyncio.create_task(_embed_batch_worker(_embed_queue))
+
+    future = asyncio.get_running_loop().create_future()
+    await _embed_queue.put((text, future))
+    embedding = await future
+
+    _embed_cache[text] = embedding
+    if len(_embed_cache) > QUERY_EMBED_CACHE_SIZE:
+        _embed_cache.popitem(last=False)
+    return embedding
+
+
+@router.on_event("startup")
+async def warm_query_clients() -> None:
+    """Create the LLM provider, Qdrant client and embedding model before the first query"""
+    try:
+        get_provider()
+        get_async_qdrant_client()
+        await asyncio.to_thread(encode_texts, ["query: warmup"])
+    except Exception as e:
+        # Not fatal: the clients are created lazily on first use anyway
+        logger.warning(f"Query client warmup failed: {e}")
+
+
+@router.on_event("shutdown")
+async def close_query_clients() -> None:
+    """Flush pending session saves, close the session store and async Qdrant client, stop the embedding worker"""
+    global _embed_worker
+    if _session_updates:
+        await asyncio.wait(list(_session_updates.values()))
+    await _session_store.close()
+    await close_async_qdrant_client()
+    if _embed_worker is not None:
+        _embed_worker.cancel()
+        _embed_worker = None
 
 
 def _rate_limit_key(request: Request) -> str:
@@ -89,6 +264,24 @@ class QueryResponse(BaseModel):
     temperature: float  # Temperature used
 
 
+class QueryLLMOutput(BaseModel):
+    """Structured answer returned by the LLM when RAG_STRUCTURED_OUTPUT is enabled."""
+    answer: str
+    facts: dict[str, Optional[str | int | float | bool]] = {}  # Scalars are stringified on merge
+    search_term: Optional[str] = None
+    clarifying_questions: list[str] = []
+
+
+_LLM_OUTPUT_SCHEMA = QueryLLMOutput.model_json_schema()
+
+_STRUCTURED_OUTPUT_SECTION = """=== OUTPUT FORMAT ===
+Reply with ONLY a JSON object, no other text:
+{"answer": "...", "facts": {"location": ..., "topic": ..., "context_details": ..., "timeframe": ...}, "clarifying_questions": ["..."], "search_term": null}
+- facts: only what the user EXPLICITLY stated in the conversation, null otherwise
+- clarifying_questions: questions you still need answered (also ask them in the answer)
+- search_term: set it instead of writing a [SEARCH: ...] tag; null if no search is needed"""
+
+
 @router.post("", response_model=QueryResponse)
 async def query(
     request: QueryRequest,
@@ -105,194 +298,671 @@ async def query(
     4. Send context + history + query to LLM
     5. Return answer with clarifying questions if needed
     """
-    from ai_config import get_llm_parameters
-
     question = request.question
 
     # Get user_type_id from authenticated user for per-type config
     user_type_id = user.get("user_type_id")
 
-    llm_params = get_llm_parameters(user_type_id=user_type_id) or {}
+    llm_params = await asyncio.to_thread(_load_llm_parameters, user_type_id)
+    top_k = _resolve_top_k(request, llm_params)
 
-    # Get top_k from config if not specified in request
-    if request.top_k is not None:
-        top_k = request.top_k
-    else:
-        try:
-            top_k = int(llm_params.get("top_k", TOP_K_VECTORS))
-        except (ValueError, TypeError):
-            top_k = TOP_K_VECTORS
-    hops = min(request.graph_hops or GRAPH_HOPS, 2)
-    
     # Session management
     session_id = request.session_id or str(uuid.uuid4())
-    session = _get_or_create_session(session_id, user)
-    
+
+    # Requests on the same session run one at a time so history stays ordered
+    async with _session_store.lock(session_id):
+        await _await_session_update(session_id)
+        session = await _start_turn(request, user, session_id)
+
+        logger.info(f"RAG query (session={session_id[:8]}): '{question[:50]}...'")
+
+        repeated = _repeated_answer(request, session)
+        if repeated is not None:
+            return await _repeated_turn_response(session_id, session, repeated, llm_params)
+
+        try:
+            # 1-3. Embed, filter, vector search, build context
+            # Profile and prompt config lookups (SQLite) overlap with embedding and vector search
+            (sources, context), user_profile_context, prompt_sections = await asyncio.gather(
+                _retrieve_context(request, user, session, top_k),
+                asyncio.to_thread(_get_user_profile_context, user),
+                asyncio.to_thread(_load_prompt_sections, user_type_id),
+            )
+
+            # 4. Call LLM with context-aware prompt (unless an identical first turn was just answered)
+            cache_key = _answer_cache_key(
+                request, user, session, sources, user_profile_context, top_k, prompt_sections, llm_params
+            )
+            cached = _answer_cache_get(cache_key) if cache_key else None
+            facts_extracted = False
+            if cached:
+                answer, clarifying_questions, full_prompt, search_term = cached
+            else:
+                # Blocking provider call runs on a worker thread so other requests keep moving
+                if STRUCTURED_OUTPUT:
+                    answer, clarifying_questions, full_prompt, search_term, facts_extracted = await asyncio.to_thread(
+                        _call_llm_structured,
+                        question, context, session, tools=request.tools, user_type_id=user_type_id,
+                        user_profile_context=user_profile_context,
+                        prompt_sections=prompt_sections, llm_params=llm_params
+                    )
+                else:
+                    answer, clarifying_questions, full_prompt, search_term = await asyncio.to_thread(
+                        _call_llm_contextual,
+                        question, context, session, tools=request.tools, user_type_id=user_type_id,
+                        user_profile_context=user_profile_context,
+                        prompt_sections=prompt_sections, llm_params=llm_params
+                    )
+                if cache_key:
+                    _answer_cache_put(cache_key, (answer, clarifying_questions, full_prompt, search_term))
+
+            await _finish_turn(session_id, session, answer, clarifying_questions, extract_facts=not facts_extracted)
+
+            logger.info(f"RAG complete. Answer: {len(answer)} chars, {len(clarifying_questions)} clarifying Qs, search_term={search_term}, facts={session.get('facts_gathered', {})}")
+
+            return QueryResponse(
+                answer=answer,
+                session_id=session_id,
+                sources=sources,
+                graph_context=_empty_graph_context(),
+                clarifying_questions=clarifying_questions,
+                search_term=search_term,  # Auto-search trigger (if web-search tool enabled)
+                context_used=_redact_prompt(full_prompt),  # For debugging - redacted to protect user data
+                temperature=_resolve_temperature(llm_params),
+            )
+
+        except Exception as e:
+            logger.error(f"RAG query failed: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/stream")
+async def query_stream(
+    request: QueryRequest,
+    user: dict = Depends(auth.require_admin_or_approved_user),
+    _: None = Depends(query_limiter),
+):
+    """
+    Streaming variant of POST /query using Server-Sent Events.
+    Requires authenticated admin OR approved user.
+
+    Emits {"type": "token", "text": ...} events as the LLM generates, then one
+    {"type": "done", ...} event carrying the same fields as QueryResponse. The
+    final answer has [SEARCH]/[FACTS] tags removed and should replace the
+    streamed text. Failures after the stream starts arrive as {"type": "error"}.
+    """
+    question = request.question
+    user_type_id = user.get("user_type_id")
+    llm_params = await asyncio.to_thread(_load_llm_parameters, user_type_id)
+    top_k = _resolve_top_k(request, llm_params)
+    session_id = request.session_id or str(uuid.uuid4())
+
+    # Reject foreign sessions before the 200 response starts
+    existing = await _session_store.get(session_id)
+    if existing is not None and not _can_access_session(user, existing):
+        raise HTTPException(status_code=403, detail="Session access denied")
+
+    async def event_stream():
+        session = None
+        async with _session_store.lock(session_id):
+            try:
+                await _await_session_update(session_id)
+                session = await _start_turn(request, user, session_id)
+                question_message = session["messages"][-1]
+                logger.info(f"RAG stream (session={session_id[:8]}): '{question[:50]}...'")
+
+                repeated = _repeated_answer(request, session)
+                if repeated is not None:
+                    final = await _repeated_turn_response(session_id, session, repeated, llm_params)
+                    yield _sse_event({"type": "token", "text": final.answer})
+                    yield _sse_event({"type": "done", **final.model_dump()})
+                    return
+
+                (sources, context), user_profile_context, prompt_sections = await asyncio.gather(
+                    _retrieve_context(request, user, session, top_k),
+                    asyncio.to_thread(_get_user_profile_context, user),
+                    asyncio.to_thread(_load_prompt_sections, user_type_id),
+                )
+                temperature = _resolve_temperature(llm_params)
+                cache_key = _answer_cache_key(
+                    request, user, session, sources, user_profile_context, top_k, prompt_sections, llm_params
+                )
+                cached = _answer_cache_get(cache_key) if cache_key else None
+                if cached:
+                    answer, clarifying_questions, prompt, search_term = cached
+                    yield _sse_event({"type": "token", "text": answer})
+                else:
+                    prompt, temperature = _build_llm_prompt(
+                        question, context, session, tools=request.tools, user_type_id=user_type_id,
+                        user_profile_context=user_profile_context,
+                        prompt_sections=prompt_sections, llm_params=llm_params
+                    )
+
+                    parts = []
+                    tokens = _stream_llm(prompt, temperature)
+                    try:
+                        async for token in tokens:
+                            parts.append(token)
+                            yield _sse_event({"type": "token", "text": token})
+                    finally:
+                        await tokens.aclose()  # Stops the provider stream if the client went away
+
+                    answer, clarifying_questions, search_term = _parse_llm_answer("".join(parts), session)
+                    if cache_key:
+                        _answer_cache_put(cache_key, (answer, clarifying_questions, prompt, search_term))
+
+                await _finish_turn(session_id, session, answer, clarifying_questions)
+
+                logger.info(f"RAG stream complete. Answer: {len(answer)} chars, {len(clarifying_questions)} clarifying Qs, search_term={search_term}")
+
+                final = QueryResponse(
+                    answer=answer,
+                    session_id=session_id,
+                    sources=sources,
+                    graph_context=_empty_graph_context(),
+                    clarifying_questions=clarifying_questions,
+                    search_term=search_term,
+                    context_used=_redact_prompt(prompt),
+                    temperature=temperature,
+                )
+                yield _sse_event({"type": "done", **final.model_dump()})
+
+            except (asyncio.CancelledError, GeneratorExit):
+                # Client disconnected mid-turn: don't leave the question unanswered in the history
+                if session is not None and session["messages"][-1] is question_message:
+                    _abandon_turn(session_id, question_message)
+                raise
+            except Exception as e:
+                logger.error(f"RAG stream failed: {e}", exc_info=True)
+                detail = e.detail if isinstance(e, HTTPException) else str(e)
+                yield _sse_event({"type": "error", "detail": detail})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse_event(payload: dict) -> str:
+    """Format one Server-Sent Events frame."""
+    return f"data: {orjson.dumps(payload).decode()}\n\n"
+
+
+async def _stream_llm(prompt: str, temperature: float) -> AsyncIterator[str]:
+    """
+    Iterate the provider's blocking token stream without blocking the event loop.
+    The stream is consumed on a worker thread; closing this iterator stops it and
+    closes the provider stream (and its HTTP response) at the next token.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+
+    def produce() -> None:
+        try:
+            tokens = get_provider().stream(prompt, temperature=temperature)
+            try:
+                for token in tokens:
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, token)
+            finally:
+                close = getattr(tokens, "close", None)
+                if close is not None:
+                    close()
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        else:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+
+    loop.run_in_executor(None, produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+def _load_llm_parameters(user_type_id: int | None) -> dict:
+    """LLM parameters with user-type overrides (SQLite read - call via asyncio.to_thread on the loop)."""
+    from ai_config import get_llm_parameters
+    return get_llm_parameters(user_type_id=user_type_id) or {}
+
+
+def _load_prompt_sections(user_type_id: int | None) -> dict:
+    """Prompt sections with user-type overrides (SQLite read - call via asyncio.to_thread on the loop)."""
+    from ai_config import get_prompt_sections
+    return get_prompt_sections(user_type_id=user_type_id) or {}
+
+
+def _resolve_top_k(request: QueryRequest, llm_params: dict) -> int:
+    """Use the request's top_k, else the configured value, else TOP_K_VECTORS."""
+    if request.top_k is not None:
+        return request.top_k
+    try:
+        return int(llm_params.get("top_k", TOP_K_VECTORS))
+    except (ValueError, TypeError):
+        return TOP_K_VECTORS
+
+
+def _resolve_temperature(llm_params: dict) -> float:
+    """Configured LLM temperature (with fallback and type coercion)."""
+    try:
+        return float(llm_params.get("temperature", 0.1))
+    except (ValueError, TypeError):
+        return 0.1
+
+
+def _empty_graph_context() -> dict:
+    """Graph context no longer used - simple vector search only."""
+    return {"actions": [], "risks": [], "guidance": [], "warnings": [], "resources": [], "preconditions": []}
+
+
+def _repeated_answer(request: QueryRequest, session: dict) -> Optional[str]:
+    """
+    The previous answer when the just-recorded question repeats (same text, ignoring
+    case and spacing) the immediately preceding user turn, else None. Only that turn
+    is matched, so the session's last sources still belong to the reused answer.
+    Off unless RAG_SESSION_DEDUPE is set; new situation details always re-run the pipeline.
+    """
+    if not SESSION_DEDUPE or request.situation_details:
+        return None
+
+    messages = session["messages"]
+    if len(messages) < 3:
+        return None
+    asked, reply = messages[-3], messages[-2]
+    if (
+        asked["role"] == "user"
+        and reply["role"] == "assistant"
+        and " ".join(asked["content"].lower().split()) == " ".join(request.question.lower().split())
+    ):
+        return reply["content"]
+    return None
+
+
+async def _repeated_turn_response(session_id: str, session: dict, answer: str, llm_params: dict) -> QueryResponse:
+    """
+    Record a repeated question's reused answer and build its response (no retrieval
+    or LLM call, so there is no prompt to report in context_used).
+    """
+    logger.info(f"RAG query (session={session_id[:8]}): repeated question, reusing previous answer")
+    clarifying_questions = _clarifying_questions(answer)
+    await _finish_turn(session_id, session, answer, clarifying_questions, extract_facts=False)
+    return QueryResponse(
+        answer=answer,
+        session_id=session_id,
+        sources=session.get("_last_sources", []),
+        graph_context=_empty_graph_context(),
+        clarifying_questions=clarifying_questions,
+        search_term=None,
+        context_used="",
+        temperature=_resolve_temperature(llm_params),
+    )
+
+
+def _utc_now_iso() -> str:
+    """
+    Naive UTC ISO timestamp with microseconds, like datetime.utcnow().isoformat().
+    The date/time part is formatted once per second and reused.
+    """
+    global _iso_second
+    now = time.time()
+    second = int(now)
+    cached_second, prefix = _iso_second
+    if second != cached_second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        _iso_second = (second, prefix)
+    return f"{prefix}.{int((now - second) * 1_000_000):06d}"
+
+
+async def _start_turn(request: QueryRequest, user: dict, session_id: str) -> dict:
+    """Load/create the session, merge user-provided context and record the question."""
+    session = await _get_or_create_session(session_id, user)
+
     # Add user context if provided
     if request.jurisdiction and not session.get("jurisdiction"):
         session["jurisdiction"] = request.jurisdiction
     if request.situation_details:
-        session["situation_details"] = session.get("situation_details", "") + "\n" + request.situation_details
-    
+        session["situation_details"] = (session.get("situation_details") or "") + "\n" + request.situation_details
+        # Only the recent tail goes into search queries; cut it once here, not per search
+        session["_situation_tail"] = session["situation_details"][-SITUATION_TAIL_CHARS:]
+
     # Add user message to history
     session["messages"].append({
         "role": "user",
-        "content": question,
-        "timestamp": datetime.utcnow().isoformat()
+        "content": request.question,
+        "timestamp": _utc_now_iso()
     })
-    
-    logger.info(f"RAG query (session={session_id[:8]}): '{question[:50]}...'")
-    
-    try:
-        # Import database module once at the start of the function
-        import database
-
-        # 1. Embed the query (include conversation context for better retrieval)
-        search_query = _build_search_query(question, session)
-        query_embedding = embed_texts([f"query: {search_query}"])[0]
-
-        # 2. Build filter for document access control
-        # Admins can search all documents; non-admin users are restricted to their allowed documents
-        search_filter = None
-        is_admin_user = user.get("type") == "admin"
-
-        if is_admin_user:
-            # Admins: only filter if they explicitly request specific job_ids
-            if request.job_ids and len(request.job_ids) > 0:
-                search_filter = {
-                    "should": [
-                        {"key": "job_id", "match": {"value": job_id}}
-                        for job_id in request.job_ids
-                    ]
-                }
-                logger.debug(f"Admin filtering search to {len(request.job_ids)} documents")
+    await _session_store.set(session_id, session)  # Persist changes (needed for the Redis store)
+    return session
+
+
+async def _retrieve_context(
+    request: QueryRequest,
+    user: dict,
+    session: dict,
+    top_k: int,
+) -> tuple[list[dict], str]:
+    """
+    Embed the question, vector search the documents the user may access,
+    and build the LLM context. Returns (sources, context).
+    """
+    import database
+
+    user_type_id = user.get("user_type_id")
+
+    # 1. Embed the queries (include conversation context for better retrieval)
+    # The gathered tasks start at the first await below, so the access-filter
+    # lookup runs on a worker thread to overlap with them
+    search_queries = _build_search_queries(request.question, session)
+    embed_task = asyncio.gather(*(_embed_query(q) for q in search_queries))
+
+    # 2. Build filter for document access control
+    # Admins can search all documents; non-admin users are restricted to their allowed documents
+    search_filter = None
+    is_admin_user = user.get("type") == "admin"
+
+    if is_admin_user:
+        # Admins: only filter if they explicitly request specific job_ids
+        if request.job_ids and len(request.job_ids) > 0:
+            search_filter = {
+                "should": [
+                    {"key": "job_id", "match": {"value": job_id}}
+                    for job_id in request.job_ids
+                ]
+            }
+            logger.debug(f"Admin filtering search to {len(request.job_ids)} documents")
+    else:
+        # Non-admin users: always filter to their allowed documents
+        if user_type_id is None:
+            # No user type means no document access for non-admin users.
+            # Avoid querying availability with None to prevent global access.
+            available_job_ids: set[str] = set()
         else:
-            # Non-admin users: always filter to their allowed documents
-            if user_type_id is None:
-                # No user type means no document access for non-admin users.
-                # Avoid querying availability with None to prevent global access.
-                available_job_ids: set[str] = set()
-            else:
-                available_job_ids = set(database.get_available_documents_for_user_type(user_type_id))
+            available_job_ids = set(await asyncio.to_thread(
+                database.get_available_documents_for_user_type, user_type_id
+            ))
 
-            if request.job_ids and len(request.job_ids) > 0:
-                # User requested specific documents - intersect with allowed
-                allowed_job_ids = [jid for jid in request.job_ids if jid in available_job_ids]
-            else:
-                # No specific request - use all allowed documents for their user type
-                allowed_job_ids = list(available_job_ids)
+        if request.job_ids and len(request.job_ids) > 0:
+            # User requested specific documents - intersect with allowed
+            allowed_job_ids = [jid for jid in request.job_ids if jid in available_job_ids]
+        else:
+            # No specific request - use all allowed documents for their user type
+            allowed_job_ids = sorted(available_job_ids)
 
-            if not allowed_job_ids:
-                # No accessible documents - return zero results
-                logger.warning(f"User has no accessible documents (user_type_id={user_type_id})")
-                search_filter = {"must": [{"key": "job_id", "match": {"value": "__impossible__"}}]}
-            else:
-                # Build OR filter: match any of the allowed job_ids
-                search_filter = {
-                    "should": [
-                        {"key": "job_id", "match": {"value": job_id}}
-                        for job_id in allowed_job_ids
-                    ]
-                }
-                logger.debug(f"Filtering search to {len(allowed_job_ids)} documents for user_type_id={user_type_id}")
-
-        # 3. Vector search in Qdrant
-        qdrant_url = f"http://{QDRANT_HOST}:{QDRANT_PORT}/collections/{COLLECTION_NAME}/points/search"
-        search_payload = {
-            "vector": query_embedding,
-            "limit": top_k,
-            "with_payload": True,
-        }
-        if search_filter:
-            search_payload["filter"] = search_filter
-
-        search_response = httpx.post(
-            qdrant_url,
-            json=search_payload,
-            timeout=30.0,
-        )
-        search_response.raise_for_status()
-        search_results = search_response.json().get("result", [])
-        
-        # Extract sources and chunk texts
-        sources, entity_names, chunk_texts = _process_search_results(search_results)
-
-        # Graph context no longer used - simple vector search only
-        graph_context = {"actions": [], "risks": [], "guidance": [], "warnings": [], "resources": [], "preconditions": []}
-
-        # 4. Build context and call LLM with context-aware prompt
-        context = _build_context(chunk_texts, sources)
-        session["_last_sources"] = sources  # For dynamic citation
-
-        # Get user profile context for chat personalization (unencrypted fields only)
-        # Skip for dev mode (id=-1) and admin accounts (no user profile in users table)
-        user_profile_context = None
-        user_id = user.get("id")
-        if user_id and user_id != -1 and user.get("type") != "admin":
-            user_profile_context = database.get_user_chat_context_values(
-                user_id=user_id,
-                user_type_id=user_type_id
+        if not allowed_job_ids:
+            # No accessible documents - return zero results
+            logger.warning(f"User has no accessible documents (user_type_id={user_type_id})")
+            search_filter = {"must": [{"key": "job_id", "match": {"value": "__impossible__"}}]}
+        else:
+            # Build OR filter: match any of the allowed job_ids
+            search_filter = {
+                "should": [
+                    {"key": "job_id", "match": {"value": job_id}}
+                    for job_id in allowed_job_ids
+                ]
+            }
+            logger.debug(f"Filtering search to {len(allowed_job_ids)} documents for user_type_id={user_type_id}")
+
+    # 3. Vector search in Qdrant - near-duplicate recent queries reuse cached hits,
+    # the rest go out in one batch request. The index version in the scope retires
+    # cached hits once documents are ingested, deleted or wiped (in any worker).
+    query_embeddings = await embed_task
+    index_version = await get_index_version()
+    scope = orjson.dumps([search_filter, top_k, index_version], option=orjson.OPT_SORT_KEYS).decode()
+    hits_per_query = [_retrieval_cache.get(scope, embedding) for embedding in query_embeddings]
+    misses = [i for i, hits in enumerate(hits_per_query) if hits is None]
+
+    if misses:
+        qdrant_filter = qdrant_models.Filter.model_validate(search_filter) if search_filter else None
+        searches = [
+            qdrant_models.SearchRequest(
+                vector=query_embeddings[i].tolist(),
+                filter=qdrant_filter,
+                limit=top_k,
+                with_payload=_SEARCH_PAYLOAD,
+                params=_SEARCH_PARAMS,
             )
-            # Only pass if there's actual data
-            if not user_profile_context:
-                user_profile_context = None
-
-        answer, clarifying_questions, full_prompt, search_term = _call_llm_contextual(
-            question, context, session, tools=request.tools, user_type_id=user_type_id,
-            user_profile_context=user_profile_context
-        )
-        
-        # Add assistant response to history
-        session["messages"].append({
-            "role": "assistant", 
-            "content": answer,
-            "timestamp": datetime.utcnow().isoformat()
-        })
-        
-        # Run dedicated fact extraction after response (more reliable than in-response tags)
-        session["facts_gathered"] = _extract_facts_from_conversation(session)
-        
-        # Update jurisdiction from extracted facts if we got location/country
-        if not session.get("jurisdiction"):
-            facts = session.get("facts_gathered", {})
-            if facts.get("location"):
-                session["jurisdiction"] = facts["location"]
-        
-        # Track what we still need to know
-        if clarifying_questions:
-            session["pending_questions"] = clarifying_questions
-        
-        # Get actual temperature for response (same logic as _call_llm_contextual)
-        try:
-            actual_temperature = float(llm_params.get("temperature", 0.1))
-        except (ValueError, TypeError):
-            actual_temperature = 0.1
-
-        logger.info(f"RAG complete. Answer: {len(answer)} chars, {len(clarifying_questions)} clarifying Qs, search_term={search_term}, facts={session.get('facts_gathered', {})}")
-
-        # Redact user profile section from debug output to avoid exposing sensitive data
-        # Use line-anchored pattern to avoid stopping at === inside values
-        debug_prompt = re.sub(
-            r'^=== USER PROFILE ===.*?(?=^===|\Z)',
-            '=== USER PROFILE ===\n[REDACTED]\n\n',
-            full_prompt,
-            flags=re.MULTILINE | re.DOTALL
+            for i in misses
+        ]
+        batch_results = await get_async_qdrant_client().search_batch(
+            collection_name=COLLECTION_NAME,
+            requests=searches,
         )
+        for i, points in zip(misses, batch_results):
+            hits = [{"id": point.id, "score": point.score, "payload": point.payload or {}} for point in points]
+            hits_per_query[i] = hits
+            _retrieval_cache.put(scope, query_embeddings[i], hits)
+
+    search_results = _fuse_search_results(hits_per_query, top_k)
+
+    # Extract sources and chunk texts
+    sources, chunk_texts = _process_search_results(search_results)
+
+    context = _build_context(chunk_texts)
+    session["_last_sources"] = sources  # For dynamic citation
+    return sources, context
 
-        return QueryResponse(
-            answer=answer,
-            session_id=session_id,
-            sources=sources,
-            graph_context=graph_context,
-            clarifying_questions=clarifying_questions,
-            search_term=search_term,  # Auto-search trigger (if web-search tool enabled)
-            context_used=debug_prompt,  # For debugging - redacted to protect user data
-            temperature=actual_temperature,
-        )
-        
-    except Exception as e:
-        logger.error(f"RAG query failed: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+
+def _get_user_profile_context(user: dict) -> dict[str, str] | None:
+    """
+    User profile values for chat personalization (unencrypted fields only).
+    Skipped for dev mode (id=-1) and admin accounts (no user profile in users table).
+    """
+    import database
+
+    user_id = user.get("id")
+    if not user_id or user_id == -1 or user.get("type") == "admin":
+        return None
+    user_profile_context = database.get_user_chat_context_values(
+        user_id=user_id,
+        user_type_id=user.get("user_type_id")
+    )
+    # Only pass if there's actual data
+    return user_profile_context or None
+
+
+async def _finish_turn(
+    session_id: str,
+    session: dict,
+    answer: str,
+    clarifying_questions: list[str],
+    extract_facts: bool = True,
+) -> None:
+    """
+    Record and save the assistant answer, then refresh session facts and the
+    history summary in the background so the response is not held up by the
+    extraction LLM calls.
+    extract_facts=False when the answer call already returned the facts.
+    """
+    # Add assistant response to history
+    session["messages"].append({
+        "role": "assistant",
+        "content": answer,
+        "timestamp": _utc_now_iso()
+    })
+
+    # Track what we still need to know
+    if clarifying_questions:
+        session["pending_questions"] = clarifying_questions
+    _set_jurisdiction_from_facts(session)
+    await _session_store.set(session_id, session)
+
+    # The background work reads a snapshot, so later turns can change the session freely
+    snapshot = {
+        "messages": list(session["messages"]),
+        "facts_gathered": dict(session.get("facts_gathered") or {}),
+        "summary": session.get("summary"),
+    }
+    task = asyncio.create_task(_update_session_facts(session_id, snapshot, extract_facts))
+    _session_updates[session_id] = task
+    task.add_done_callback(partial(_on_session_update_done, session_id))
+
+
+def _abandon_turn(session_id: str, question_message: dict) -> None:
+    """
+    Drop a question whose answer never finished (client disconnected mid-stream).
+    Runs as the session's background update because the streaming task is being
+    cancelled; the next turn waits for it like any other update.
+    """
+    task = asyncio.create_task(_drop_unanswered_question(session_id, question_message))
+    _session_updates[session_id] = task
+    task.add_done_callback(partial(_on_session_update_done, session_id))
+
+
+async def _drop_unanswered_question(session_id: str, question_message: dict) -> None:
+    """Remove the question from the saved history if it is still the last message."""
+    session = await _session_store.get(session_id)
+    if session is None:
+        return
+    messages = session["messages"]
+    if messages and messages[-1] == question_message:
+        messages.pop()
+        await _session_store.set(session_id, session)
+        logger.info(f"Dropped unanswered question after client disconnect (session={session_id[:8]})")
+
+
+async def _update_session_facts(session_id: str, snapshot: dict, extract_facts: bool = True) -> None:
+    """
+    Fact extraction and history compaction for a finished turn. The blocking LLM
+    calls run on a worker thread against a snapshot of the turn; the results are
+    then merged into a freshly loaded session on the event loop, so turns saved
+    meanwhile (e.g. by another worker) are kept.
+    """
+    facts = None
+    # Run dedicated fact extraction after response (more reliable than in-response tags),
+    # unless the user only acknowledged and there is nothing new to extract
+    if extract_facts and _has_new_user_information(snapshot):
+        facts = await asyncio.to_thread(_extract_facts_from_conversation, snapshot)
+
+    dropped, summary = [], None
+    if len(snapshot["messages"]) > SESSION_MAX_MESSAGES:
+        dropped, summary = await asyncio.to_thread(_summarize_older_history, snapshot)
+
+    if not facts and not dropped:
+        return
+
+    session = await _session_store.get(session_id)
+    if session is None:
+        return  # Deleted or expired meanwhile
+
+    if facts:
+        session["facts_gathered"] = {**(session.get("facts_gathered") or {}), **facts}
+        _set_jurisdiction_from_facts(session)
+
+    # Drop the summarized messages only if they still lead the history
+    # (another update may already have compacted it)
+    messages = session["messages"]
+    if dropped and messages[:len(dropped)] == dropped:
+        del messages[:len(dropped)]
+        if summary:
+            session["summary"] = summary
+
+    await _session_store.set(session_id, session)
+
+
+def _set_jurisdiction_from_facts(session: dict) -> None:
+    """Update jurisdiction from extracted facts if we got location/country."""
+    if not session.get("jurisdiction"):
+        facts = session.get("facts_gathered") or {}
+        if facts.get("location"):
+            session["jurisdiction"] = facts["location"]
+
+
+def _has_new_user_information(session: dict) -> bool:
+    """False when the latest user message is a bare acknowledgement or only punctuation/emoji."""
+    last_user = next((m["content"] for m in reversed(session["messages"]) if m["role"] == "user"), "")
+    normalized = " ".join(_NON_WORD_RE.sub(" ", last_user.lower()).split())
+    return bool(normalized) and normalized not in _ACKNOWLEDGEMENTS
+
+
+def _on_session_update_done(session_id: str, task: asyncio.Task) -> None:
+    """Forget a finished background update and log unexpected failures."""
+    if _session_updates.get(session_id) is task:
+        del _session_updates[session_id]
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Session update failed (session={session_id[:8]}): {task.exception()}")
+
+
+async def _await_session_update(session_id: str) -> None:
+    """Wait for the previous turn's background update so this turn sees its facts."""
+    task = _session_updates.get(session_id)
+    if task is not None:
+        await asyncio.wait({task})
+
+
+def _answer_cache_key(
+    request: QueryRequest,
+    user: dict,
+    session: dict,
+    sources: list[dict],
+    user_profile_context: dict[str, str] | None,
+    top_k: int,
+    prompt_sections: dict,
+    llm_params: dict,
+) -> Optional[str]:
+    """
+    Cache key for a first-turn answer, or None when the answer depends on
+    per-user state (history, known facts, profile data) and must not be shared.
+    All retrieved chunk ids are part of the key, so document access is respected,
+    and so is the prompt config, so admin edits take effect immediately.
+    """
+    if ANSWER_CACHE_SIZE <= 0 or user_profile_context:
+        return None
+    if len(session["messages"]) > 1 or session.get("summary") or session.get("facts_gathered"):
+        return None
+
+    prompt_config = orjson.dumps(
+        [prompt_sections, llm_params],
+        option=orjson.OPT_SORT_KEYS,
+        default=str,
+    )
+    key = "|".join([
+        " ".join(request.question.lower().split()),
+        session.get("jurisdiction") or "",
+        str(user.get("user_type_id")),
+        ",".join(sorted(request.tools)),
+        str(top_k),
+        ",".join(src["chunk_id"] for src in sources),
+        prompt_config.decode(),
+    ])
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def _answer_cache_get(key: str) -> Optional[tuple[str, list[str], str, Optional[str]]]:
+    """Cached (answer, clarifying_questions, prompt, search_term), or None if missing/expired."""
+    entry = _answer_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, (answer, clarifying_questions, prompt, search_term) = entry
+    if expires_at < time.monotonic():
+        del _answer_cache[key]
+        return None
+    _answer_cache.move_to_end(key)
+    return answer, list(clarifying_questions), prompt, search_term
+
+
+def _answer_cache_put(key: str, value: tuple[str, list[str], str, Optional[str]]) -> None:
+    """Store an answer for ANSWER_CACHE_TTL_SECONDS, evicting least recently used entries."""
+    _answer_cache[key] = (time.monotonic() + ANSWER_CACHE_TTL_SECONDS, value)
+    _answer_cache.move_to_end(key)
+    while len(_answer_cache) > ANSWER_CACHE_SIZE:
+        _answer_cache.popitem(last=False)
+
+
+def _redact_prompt(full_prompt: str) -> str:
+    """
+    Redact user profile section from debug output to avoid exposing sensitive data.
+    Uses a line-anchored pattern to avoid stopping at === inside values.
+    """
+    return _PROFILE_SECTION_RE.sub('=== USER PROFILE ===\n[REDACTED]\n\n', full_prompt)
 
 
 def _session_owner_for_user(user: dict) -> tuple[str, str]:
@@ -320,30 +990,31 @@ def _can_access_session(user: dict, session: dict) -> bool:
     )
 
 
-def _get_or_create_session(session_id: str, user: dict) -> dict:
+async def _get_or_create_session(session_id: str, user: dict) -> dict:
     """Get existing authorized session or create a new owner-scoped session."""
     owner_type, owner_id = _session_owner_for_user(user)
 
-    if session_id in _sessions:
-        session = _sessions[session_id]
+    session = await _session_store.get(session_id)
+    if session is not None:
         if not _can_access_session(user, session):
             raise HTTPException(status_code=403, detail="Session access denied")
         return session
 
     # New sessions are always owned by the caller creating them.
-    if session_id not in _sessions:
-        _sessions[session_id] = {
-            "id": session_id,
-            "owner_type": owner_type,
-            "owner_id": owner_id,
-            "created_at": datetime.utcnow().isoformat(),
-            "messages": [],
-            "jurisdiction": None,
-            "situation_details": None,
-            "facts_gathered": {},
-            "pending_questions": [],
-        }
-    return _sessions[session_id]
+    session = {
+        "id": session_id,
+        "owner_type": owner_type,
+        "owner_id": owner_id,
+        "created_at": _utc_now_iso(),
+        "messages": [],
+        "jurisdiction": None,
+        "situation_details": None,
+        "facts_gathered": {},
+        "pending_questions": [],
+        "summary": None,
+    }
+    await _session_store.set(session_id, session)
+    return session
 
 
 def _extract_facts_from_conversation(session: dict) -> dict:
@@ -351,9 +1022,8 @@ def _extract_facts_from_conversation(session: dict) -> dict:
     Dedicated fact extraction pass - runs after main response.
     Uses a focused prompt to reliably extract structured facts from conversation.
     """
-    import json as json_module
     llm = get_provider()
-    
+
     # Format conversation for fact extraction
     messages = session.get("messages", [])
     if not messages:
@@ -389,14 +1059,16 @@ Return ONLY valid JSON, no explanation:
         # Try to extract JSON from response (handle markdown code blocks)
         if "```" in content:
             # Extract from code block
-            import re
-            json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', content, re.DOTALL)
+            json_match = _JSON_BLOCK_RE.search(content)
             if json_match:
                 content = json_match.group(1)
         
         # Parse JSON
-        extracted = json_module.loads(content)
-        
+        extracted = orjson.loads(content)
+        if not isinstance(extracted, dict):
+            logger.warning(f"Fact extraction returned {type(extracted).__name__}, expected an object")
+            return existing_facts
+
         # Merge with existing facts, only updating non-null values
         for key, value in extracted.items():
             if value is not None and value != "null" and value != "":
@@ -404,70 +1076,128 @@ Return ONLY valid JSON, no explanation:
         
         logger.info(f"Fact extraction complete: {existing_facts}")
         return existing_facts
-        
+
+    except orjson.JSONDecodeError as e:
+        logger.warning(f"Fact extraction returned invalid JSON: {e}")
+        return existing_facts
     except Exception as e:
         logger.warning(f"Fact extraction failed: {e}")
         return existing_facts
 
 
+def _summarize_older_history(session: dict) -> tuple[list[dict], Optional[str]]:
+    """
+    Keep session history bounded: once it exceeds SESSION_MAX_MESSAGES, summarize
+    the older half (blocking LLM call). Returns (messages to drop, new summary or None).
+    """
+    messages = session["messages"]
+    if len(messages) <= SESSION_MAX_MESSAGES:
+        return [], None
+
+    cut = len(messages) // 4 * 2  # Older half, in whole user/assistant exchanges
+    conversation_text = "\n".join([
+        f"{'User' if m['role']=='user' else 'Assistant'}: {m['content'][:300]}"
+        for m in messages[:cut]
+    ])
+    previous = session.get("summary") or "(none)"
+
+    prompt = f"""Summarize this earlier part of a conversation in at most two sentences.
+Keep what the user needs help with and what has already been advised. No preamble.
+
+Previous summary:
+{previous}
+
+Conversation:
+{conversation_text}"""
+
+    summary = None
+    try:
+        response = get_provider().complete(prompt, temperature=0.0)
+        summary = " ".join(response.content.split()) or None
+    except Exception as e:
+        # Keep the previous summary; the messages are dropped either way to stay bounded
+        logger.warning(f"History summary failed: {e}")
+
+    return messages[:cut], summary
+
+
 def _build_search_query(question: str, session: dict) -> str:
     """Build search query including relevant session context."""
-    parts = [question]
-    
-    if session.get("jurisdiction"):
-        parts.append(f"jurisdiction: {session['jurisdiction']}")
-    
-    if session.get("situation_details"):
-        # Include recent situation details for better retrieval
-        parts.append(session["situation_details"][-500:])
-    
-    return " ".join(parts)
+    jurisdiction = session.get("jurisdiction")
+    # Include recent situation details for better retrieval
+    situation_tail = session.get("_situation_tail")
+    if situation_tail is None and session.get("situation_details"):
+        situation_tail = session["situation_details"][-SITUATION_TAIL_CHARS:]
+
+    if jurisdiction and situation_tail:
+        return f"{question} jurisdiction: {jurisdiction} {situation_tail}"
+    if jurisdiction:
+        return f"{question} jurisdiction: {jurisdiction}"
+    if situation_tail:
+        return f"{question} {situation_tail}"
+    return question
+
+
+def _build_search_queries(question: str, session: dict) -> list[str]:
+    """Queries searched per turn: the context-enriched query, plus the bare question if different."""
+    search_query = _build_search_query(question, session)
+    if search_query == question:
+        return [search_query]
+    return [search_query, question]
+
+
+def _fuse_search_results(result_lists: list[list[dict]], limit: int) -> list[dict]:
+    """
+    Merge per-query Qdrant hits with reciprocal-rank fusion, best first.
+    Each point keeps its highest raw score for display.
+    """
+    if len(result_lists) <= 1:
+        return result_lists[0][:limit] if result_lists else []
+
+    hits: dict = {}
+    rrf_scores: dict = {}
+    for results in result_lists:
+        for rank, hit in enumerate(results, 1):
+            point_id = hit.get("id")
+            rrf_scores[point_id] = rrf_scores.get(point_id, 0.0) + 1.0 / (RRF_K + rank)
+            best = hits.get(point_id)
+            if best is None or hit.get("score", 0) > best.get("score", 0):
+                hits[point_id] = hit
+
+    ranked = sorted(rrf_scores, key=rrf_scores.__getitem__, reverse=True)
+    return [hits[point_id] for point_id in ranked[:limit]]
 
 
-def _process_search_results(search_results: list) -> tuple[list, set, list]:
-    """Process Qdrant results into sources, entity names, and chunk texts."""
+def _process_search_results(search_results: list) -> tuple[list, list]:
+    """Process Qdrant results into sources and chunk texts."""
     sources = []
-    entity_names = set()
     chunk_texts = []
-    
     for result in search_results:
-        payload = result.get("payload", {})
-        score = result.get("score", 0)
-        
+        payload = result.get("payload") or {}
+        text = payload.get("text")
         sources.append({
-            "score": score,
+            "score": result.get("score", 0),
             "type": payload.get("type", "unknown"),
-            "text": payload.get("text") or payload.get("fact_text", ""),
+            "text": text or payload.get("fact_text", ""),
             "chunk_id": payload.get("chunk_id", ""),
             "source_file": payload.get("source_file", ""),
         })
-        
-        if payload.get("type") == "fact":
-            entity_names.add(payload.get("from_entity", ""))
-            entity_names.add(payload.get("to_entity", ""))
-        
-        if payload.get("text"):
-            chunk_texts.append(payload.get("text"))
-        
-        for name in payload.get("entity_names", []):
-            entity_names.add(name)
-    
-    entity_names.discard("")
-    return sources, entity_names, chunk_texts
+        if text:
+            chunk_texts.append(text)
+    return sources, chunk_texts
 
 
-def _build_context(chunk_texts: list[str], sources: list[dict]) -> str:
+def _build_context(chunk_texts: list[str]) -> str:
     """Build context string from retrieved chunks."""
-    parts = []
+    if not chunk_texts:
+        return ""
 
-    # Include full chunk texts
-    if chunk_texts:
-        parts.append("=== RELEVANT PASSAGES ===")
-        for i, text in enumerate(chunk_texts[:6], 1):
-            parts.append(f"[{i}] {text[:800]}")
-            parts.append("")
-
-    return "\n".join(parts)
+    # Include chunk texts (capped per passage), joined once
+    passages = "\n\n".join(
+        f"[{i}] {text[:CONTEXT_PASSAGE_CHARS]}"
+        for i, text in enumerate(chunk_texts[:CONTEXT_MAX_PASSAGES], 1)
+    )
+    return f"=== RELEVANT PASSAGES ===\n{passages}\n"
 
 
 def _call_llm_contextual(
@@ -476,7 +1206,9 @@ def _call_llm_contextual(
     session: dict,
     tools: Optional[list[str]] = None,
     user_type_id: int | None = None,
-    user_profile_context: dict[str, str] | None = None
+    user_profile_context: dict[str, str] | None = None,
+    prompt_sections: dict | None = None,
+    llm_params: dict | None = None,
 ) -> tuple[str, list[str], str, Optional[str]]:
     """
     Call LLM with context-aware prompt.
@@ -489,62 +1221,86 @@ def _call_llm_contextual(
         tools: List of enabled tool IDs
         user_type_id: If provided, uses user-type-specific prompt sections and parameters
         user_profile_context: Optional dict of {field_name: value} for user profile data
+        prompt_sections, llm_params: Config already loaded for this turn (loaded here if None)
     """
-    import re
-    from ai_config import get_prompt_sections, get_llm_parameters
-    llm = get_provider()
-    tools = tools or []
+    prompt, temperature = _build_llm_prompt(
+        question, context, session, tools=tools, user_type_id=user_type_id,
+        user_profile_context=user_profile_context,
+        prompt_sections=prompt_sections, llm_params=llm_params
+    )
 
-    # Get prompt sections from database with user-type overrides if applicable
-    prompt_sections = get_prompt_sections(user_type_id=user_type_id) or {}
-    llm_params = get_llm_parameters(user_type_id=user_type_id) or {}
+    response = get_provider().complete(prompt, temperature=temperature)
+    answer, clarifying_questions, search_term = _parse_llm_answer(response.content, session)
 
-    # Get temperature from config (with fallback and type coercion)
-    try:
-        temperature = float(llm_params.get("temperature", 0.1))
-    except (ValueError, TypeError):
-        temperature = 0.1
+    # Return answer, questions, full prompt for debugging, and search term
+    return answer, clarifying_questions, prompt, search_term
 
-    # Build conversation history for context
-    history_str = ""
-    if session["messages"]:
-        recent = session["messages"][-6:]  # Last 3 exchanges
-        history_str = "\n".join([
-            f"{'User' if m['role']=='user' else 'Assistant'}: {m['content'][:300]}"
-            for m in recent[:-1]  # Exclude current message
-        ])
 
-    # Extract source files from context for citation
-    source_files = set()
-    for src in session.get("_last_sources", []):
-        sf = src.get("source_file", "")
-        if sf:
-            source_files.add(sf.replace(".pdf", "").replace("-", " ").replace("_", " "))
-    source_citation = ", ".join(source_files) if source_files else "knowledge base documents"
+def _call_llm_structured(
+    question: str,
+    context: str,
+    session: dict,
+    tools: Optional[list[str]] = None,
+    user_type_id: int | None = None,
+    user_profile_context: dict[str, str] | None = None,
+    prompt_sections: dict | None = None,
+    llm_params: dict | None = None,
+) -> tuple[str, list[str], str, Optional[str], bool]:
+    """
+    One LLM call returning the answer and the conversation facts as JSON.
+    Returns (answer, clarifying questions, full_prompt, search_term, facts_extracted).
+    Falls back to tag parsing (facts_extracted=False) if the model does not return valid JSON,
+    or to a plain completion if the structured request itself fails.
+    """
+    prompt, temperature = _build_llm_prompt(
+        question, context, session, tools=tools, user_type_id=user_type_id,
+        user_profile_context=user_profile_context,
+        prompt_sections=prompt_sections, llm_params=llm_params, structured=True
+    )
 
-    # Build known facts section - treat these as CONFIRMED, do not re-ask
-    facts = session.get("facts_gathered", {})
-    if facts:
-        facts_lines = []
-        for key, value in facts.items():
-            if value:
-                facts_lines.append(f"  - {key}: {value}")
-        known_facts_section = "=== CONFIRMED FACTS (do NOT re-ask these) ===\n" + "\n".join(facts_lines)
-        jurisdiction_note = "Use the confirmed facts above. Only ask clarifying questions about things NOT already known."
-    else:
-        known_facts_section = "=== NO FACTS CONFIRMED YET ===\nAsk about location and context early, but only once per conversation."
-        jurisdiction_note = "We don't know location yet. Ask about it, but don't repeatedly ask if user doesn't answer."
+    provider = get_provider()
+    try:
+        response = provider.complete_json(prompt, _LLM_OUTPUT_SCHEMA, temperature=temperature)
+    except Exception as e:
+        # Backends that reject response_format (or fail mid-request) still get a plain completion
+        logger.warning(f"Structured completion failed, falling back to plain completion: {e}")
+        response = provider.complete(prompt, temperature=temperature)
+        answer, clarifying_questions, search_term = _parse_llm_answer(response.content, session)
+        return answer, clarifying_questions, prompt, search_term, False
 
-    # Build user profile section (if any profile data is available)
-    user_profile_section = ""
-    if user_profile_context:
-        profile_lines = [f"  - {field_name}: {sanitize_profile_value(value)}" for field_name, value in user_profile_context.items()]
-        user_profile_section = "\n\n=== USER PROFILE ===\nThe following information is known about the user:\n" + "\n".join(profile_lines)
+    content = response.content.strip()
+    json_match = _JSON_BLOCK_RE.search(content)
+    if json_match:
+        content = json_match.group(1)
 
-    # Auto-search instruction if web-search tool is enabled
-    search_instruction = ""
-    if "web-search" in tools:
-        search_instruction = """
+    try:
+        output = QueryLLMOutput.model_validate_json(content)
+    except ValidationError as e:
+        logger.warning(f"Structured answer did not match the schema, falling back to tag parsing: {e}")
+        raw = response.content
+        # Valid JSON with an off-schema field: still show only the answer text
+        try:
+            parsed = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            parsed = None
+        if isinstance(parsed, dict) and isinstance(parsed.get("answer"), str):
+            raw = parsed["answer"]
+        answer, clarifying_questions, search_term = _parse_llm_answer(raw, session)
+        return answer, clarifying_questions, prompt, search_term, False
+
+    # Merge with existing facts, only updating non-null values
+    facts = session.setdefault("facts_gathered", {})
+    for key, value in output.facts.items():
+        if value is not None and value != "null" and value != "":
+            facts[key] = str(value)
+
+    clarifying_questions = [q.strip() for q in output.clarifying_questions if q.strip()]
+    search_term = (output.search_term or "").strip() or None
+    return output.answer.strip(), clarifying_questions, prompt, search_term, True
+
+
+# Auto-search instruction appended to the style section when web-search is enabled
+_SEARCH_INSTRUCTION = """
 === AUTO-SEARCH (IMPORTANT!) ===
 Add [SEARCH: specific term] at the END of your response when:
 - User says "I don't know anyone/any lawyers/who to call" → SEARCH NOW
@@ -555,18 +1311,38 @@ Do NOT tell them to "look up" or "search for" something - just trigger the searc
 Make search terms specific: "[SEARCH: local library hours downtown]"
 """
 
+_JURISDICTION_NOTE_KNOWN = "Use the confirmed facts below. Only ask clarifying questions about things NOT already known."
+_JURISDICTION_NOTE_UNKNOWN = "We don't know location yet. Ask about it, but don't repeatedly ask if user doesn't answer."
+
+_CONFIRMED_FACTS_HEADER = "=== CONFIRMED FACTS (do NOT re-ask these) ===\n"
+_NO_FACTS_SECTION = "=== NO FACTS CONFIRMED YET ===\nAsk about location and context early, but only once per conversation."
+
+
+@lru_cache(maxsize=256)
+def _prompt_preamble(
+    prompt_tone: str,
+    prompt_rules: tuple[str, ...],
+    prompt_forbidden: tuple[str, ...],
+    web_search: bool,
+    has_facts: bool,
+) -> str:
+    """
+    Static head of the answer prompt (role, style, rules, forbidden topics).
+    Built once per config/tool/facts combination and kept byte-identical so
+    providers with prefix caching can reuse it across turns.
+    """
+    jurisdiction_note = _JURISDICTION_NOTE_KNOWN if has_facts else _JURISDICTION_NOTE_UNKNOWN
+
     # Build style section from config
-    prompt_tone = prompt_sections.get("prompt_tone", "Be helpful, concise, and professional.")
     style_section = f"=== STYLE ===\n{prompt_tone}"
-    if search_instruction:
-        style_section += f"\n{search_instruction}"
+    if web_search:
+        style_section += f"\n{_SEARCH_INSTRUCTION}"
 
     # Build rules section from config
-    prompt_rules = prompt_sections.get("prompt_rules", [])
-    if isinstance(prompt_rules, list) and prompt_rules:
+    if prompt_rules:
         rules_lines = [f"{i}. {rule}" for i, rule in enumerate(prompt_rules, 1)]
         rules_lines.append(f"{len(prompt_rules) + 1}. {jurisdiction_note}")
-        rules_lines.append(f"{len(prompt_rules) + 2}. Do NOT repeat questions already answered in CONFIRMED FACTS above")
+        rules_lines.append(f"{len(prompt_rules) + 2}. Do NOT repeat questions already answered in CONFIRMED FACTS")
         rules_section = "=== RULES ===\n" + "\n".join(rules_lines)
     else:
         rules_section = f"""=== RULES ===
@@ -574,22 +1350,101 @@ Make search terms specific: "[SEARCH: local library hours downtown]"
 2. NEVER invent sources, organization names, or contact information
 3. If asked about topics outside your knowledge base, acknowledge limitations
 4. {jurisdiction_note}
-5. Do NOT repeat questions already answered in CONFIRMED FACTS above"""
+5. Do NOT repeat questions already answered in CONFIRMED FACTS"""
 
     # Build forbidden topics section from config (if any)
-    prompt_forbidden = prompt_sections.get("prompt_forbidden", [])
     forbidden_section = ""
-    if isinstance(prompt_forbidden, list) and prompt_forbidden:
+    if prompt_forbidden:
         forbidden_section = "\n\n=== FORBIDDEN TOPICS ===\nIf asked about these topics, politely decline:\n"
         forbidden_section += "\n".join([f"- {topic}" for topic in prompt_forbidden])
 
-    prompt = f"""You are a helpful, knowledgeable assistant.
-
-{known_facts_section}{user_profile_section}
+    return f"""You are a helpful, knowledgeable assistant.
 
 {style_section}
 
-{rules_section}{forbidden_section}
+{rules_section}{forbidden_section}"""
+
+
+@lru_cache(maxsize=1024)
+def _format_source_citation(source_files: tuple[str, ...]) -> str:
+    """Readable, stable citation line for a sorted tuple of source file names."""
+    names = dict.fromkeys(
+        sf.replace(".pdf", "").replace("-", " ").replace("_", " ")
+        for sf in source_files if sf
+    )
+    return ", ".join(names) if names else "knowledge base documents"
+
+
+def _build_llm_prompt(
+    question: str,
+    context: str,
+    session: dict,
+    tools: Optional[list[str]] = None,
+    user_type_id: int | None = None,
+    user_profile_context: dict[str, str] | None = None,
+    prompt_sections: dict | None = None,
+    llm_params: dict | None = None,
+    structured: bool = False,
+) -> tuple[str, float]:
+    """
+    Build the context-aware prompt for the main answer.
+    Returns (prompt, temperature). Arguments as for _call_llm_contextual;
+    structured=True appends the JSON output format section.
+    """
+    tools = tools or []
+
+    # Get prompt sections from database with user-type overrides if applicable
+    if prompt_sections is None:
+        prompt_sections = _load_prompt_sections(user_type_id)
+    if llm_params is None:
+        llm_params = _load_llm_parameters(user_type_id)
+    temperature = _resolve_temperature(llm_params)
+
+    # Build conversation history for context
+    # Last 3 exchanges, excluding the current message (one slice of the bounded history)
+    history_str = "\n".join([
+        f"{'User' if m['role']=='user' else 'Assistant'}: {m['content'][:HISTORY_MESSAGE_CHARS]}"
+        for m in session["messages"][-6:-1]
+    ])
+    if session.get("summary"):
+        history_str = f"Summary: {session['summary']}\n{history_str}".rstrip("\n")
+
+    # Extract source files from context for citation
+    source_citation = _format_source_citation(tuple(sorted({
+        src.get("source_file", "") for src in session.get("_last_sources", [])
+    })))
+
+    # Build known facts section - treat these as CONFIRMED, do not re-ask
+    facts = session.get("facts_gathered", {})
+    if facts:
+        known_facts_section = _CONFIRMED_FACTS_HEADER + "\n".join(
+            f"  - {key}: {value}" for key, value in facts.items() if value
+        )
+    else:
+        known_facts_section = _NO_FACTS_SECTION
+
+    # Build user profile section (if any profile data is available)
+    user_profile_section = ""
+    if user_profile_context:
+        profile_lines = [f"  - {field_name}: {sanitize_profile_value(value)}" for field_name, value in user_profile_context.items()]
+        user_profile_section = "\n\n=== USER PROFILE ===\nThe following information is known about the user:\n" + "\n".join(profile_lines)
+
+    # Static head first, per-turn sections after it
+    prompt_rules = prompt_sections.get("prompt_rules", [])
+    prompt_forbidden = prompt_sections.get("prompt_forbidden", [])
+    preamble = _prompt_preamble(
+        str(prompt_sections.get("prompt_tone", "Be helpful, concise, and professional.")),
+        tuple(str(rule) for rule in prompt_rules) if isinstance(prompt_rules, list) else (),
+        tuple(str(topic) for topic in prompt_forbidden) if isinstance(prompt_forbidden, list) else (),
+        "web-search" in tools,
+        bool(facts),
+    )
+
+    output_format_section = f"{_STRUCTURED_OUTPUT_SECTION}\n\n" if structured else ""
+
+    prompt = f"""{preamble}
+
+{known_facts_section}{user_profile_section}
 
 === SOURCE ===
 {source_citation}
@@ -603,22 +1458,29 @@ Make search terms specific: "[SEARCH: local library hours downtown]"
 === QUESTION ===
 {question}
 
-=== RESPOND ==="""
+{output_format_section}=== RESPOND ==="""
+
+    return prompt, temperature
+
+
+def _parse_llm_answer(raw: str, session: dict) -> tuple[str, list[str], Optional[str]]:
+    """
+    Strip [SEARCH:]/[FACTS:] tags from a raw LLM answer, storing any facts on the session.
+    Returns (answer, list of clarifying questions, search_term or None).
+    """
+    answer = raw
 
-    response = llm.complete(prompt, temperature=temperature)
-    answer = response.content
-    
     # Extract search term if present
     search_term = None
-    search_match = re.search(r'\[SEARCH:\s*([^\]]+)\]', answer)
+    search_match = _SEARCH_TAG_RE.search(answer)
     if search_match:
         search_term = search_match.group(1).strip()
         # Remove the search tag from the visible answer
-        answer = re.sub(r'\s*\[SEARCH:\s*[^\]]+\]\s*', '', answer).strip()
-    
+        answer = _SEARCH_TAG_RE.sub('', answer).strip()
+
     # Extract and store facts (always strip from visible answer)
-    answer = re.sub(r'\s*\[FACTS:[^\]]*\]\s*', '', answer).strip()
-    facts_match = re.search(r'\[FACTS:\s*([^\]]+)\]', response.content)
+    answer = _FACTS_STRIP_RE.sub('', answer).strip()
+    facts_match = _FACTS_TAG_RE.search(raw)
     if facts_match:
         facts_str = facts_match.group(1).strip()
         if facts_str:
@@ -631,26 +1493,26 @@ Make search terms specific: "[SEARCH: local library hours downtown]"
                             session["facts_gathered"] = {}
                         session["facts_gathered"][key] = value
             logger.info(f"Session facts updated: {session.get('facts_gathered', {})}")
-    
-    # Extract clarifying questions (lines starting with ?)
+
+    return answer, _clarifying_questions(answer), search_term
+
+
+def _clarifying_questions(answer: str) -> list[str]:
+    """Clarifying questions in an answer (lines starting with ?)."""
     clarifying_questions = []
-    lines = answer.split("\n")
-    
-    for line in lines:
+    for line in answer.split("\n"):
         stripped = line.strip()
         if stripped.startswith("?"):
             clarifying_questions.append(stripped[1:].strip())
-    
-    # Return answer, questions, full prompt for debugging, and search term
-    return answer, clarifying_questions, prompt, search_term
+    return clarifying_questions
 
 
 @router.get("/session/{session_id}")
 async def get_session(session_id: str, user: dict = Depends(auth.require_admin_or_approved_user)):
     """Get session history and state. Requires auth."""
-    if session_id not in _sessions:
+    session = await _session_store.get(session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
-    session = _sessions[session_id]
     if not _can_access_session(user, session):
         raise HTTPException(status_code=403, detail="Session access denied")
     return session
@@ -659,9 +1521,14 @@ async def get_session(session_id: str, user: dict = Depends(auth.require_admin_o
 @router.delete("/session/{session_id}")
 async def delete_session(session_id: str, user: dict = Depends(auth.require_admin_or_approved_user)):
     """Delete a session. Requires auth."""
-    if session_id in _sessions:
-        session = _sessions[session_id]
+    session = await _session_store.get(session_id)
+    if session is not None:
         if not _can_access_session(user, session):
             raise HTTPException(status_code=403, detail="Session access denied")
-        del _sessions[session_id]
+        # Stop a pending background update so it cannot re-save the deleted session
+        task = _session_updates.get(session_id)
+        if task is not None:
+            task.cancel()
+            await asyncio.wait({task})
+        await _session_store.delete(session_id)
     return {"status": "deleted"}
@@ -0,0 +1,88 @@
+"""
+Similarity cache for vector search results.
+Near-duplicate query vectors reuse recent hits - no external dependencies.
+"""
+
+import time
+from typing import Optional
+
+import numpy as np
+
+
+class SemanticRetrievalCache:
+    """
+    Fixed-size cache of (query vector -> search hits), matched by cosine similarity.
+
+    Vectors live in one preallocated float32 matrix, so a lookup is a single
+    matrix-vector product. Hits are only reused within the same scope (access
+    filter + limit) and for ttl_seconds; the oldest slot is overwritten first.
+    Returned hit lists are shared and must not be mutated.
+
+    Usage:
+        cache = SemanticRetrievalCache(max_entries=1024, threshold=0.95, ttl_seconds=300)
+
+        hits = cache.get(scope, vector)
+        if hits is None:
+            hits = search(vector)
+            cache.put(scope, vector, hits)
+    """
+
+    def __init__(self, max_entries: int, threshold: float, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self._vectors: Optional[np.ndarray] = None  # (max_entries, dim), allocated on first put
+        self._scope_hashes = np.zeros(max_entries, dtype=np.int64)
+        self._stored_at = np.zeros(max_entries, dtype=np.float64)
+        self._scopes: list[Optional[str]] = [None] * max_entries
+        self._results: list[Optional[list[dict]]] = [None] * max_entries
+        self._count = 0
+        self._next = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get(self, scope: str, vector: np.ndarray) -> Optional[list[dict]]:
+        """Return hits cached for the most similar vector in scope, or None below threshold."""
+        if self._vectors is None or self._count == 0 or vector.shape[0] != self._vectors.shape[1]:
+            return None
+
+        count = self._count
+        scores = self._vectors[:count] @ _normalize(vector)
+        usable = (
+            (self._scope_hashes[:count] == hash(scope))
+            & (self._stored_at[:count] >= time.monotonic() - self.ttl_seconds)
+        )
+        scores = np.where(usable, scores, -np.inf)
+
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold or self._scopes[best] != scope:
+            return None
+        return self._results[best]
+
+    def put(self, scope: str, vector: np.ndarray, results: list[dict]) -> None:
+        """Cache hits for a query vector, overwriting the oldest slot when full."""
+        if self.max_entries <= 0:
+            return
+        if self._vectors is None or vector.shape[0] != self._vectors.shape[1]:
+            # First entry (or the embedding model changed): start a fresh matrix
+            self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+            self._count = 0
+            self._next = 0
+
+        slot = self._next
+        self._vectors[slot] = _normalize(vector)
+        self._scope_hashes[slot] = hash(scope)
+        self._stored_at[slot] = time.monotonic()
+        self._scopes[slot] = scope
+        self._results[slot] = results
+
+        self._next = (slot + 1) % self.max_entries
+        self._count = min(self._count + 1, self.max_entries)
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    """Unit-length float32 copy of a vector (zero vectors stay zero)."""
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
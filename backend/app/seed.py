@@ -15,7 +15,13 @@ from qdrant_client.models import Distance, VectorParams, PointStruct
 import database
 
 # Use unified embedding from store.py
-from store import get_embedding_model, embed_texts, EMBEDDING_MODEL
+from store import (
+    get_embedding_model,
+    embed_texts,
+    ensure_qdrant_collection,
+    EMBEDDING_MODEL,
+    QDRANT_QUANTIZATION_CONFIG,
+)
 
 # Configuration
 QDRANT_HOST = os.getenv("QDRANT_HOST", "localhost")
@@ -88,8 +94,10 @@ def seed_qdrant(client):
         collection_name=COLLECTION_NAME,
         vectors_config=VectorParams(
             size=vector_dim,
-            distance=Distance.COSINE
-        )
+            distance=Distance.COSINE,
+            on_disk=True,
+        ),
+        quantization_config=QDRANT_QUANTIZATION_CONFIG,
     )
     
     # Insert into Qdrant - use UUID derived from claim ID
@@ -111,6 +119,11 @@ def seed_qdrant(client):
     )
     print(f"  Inserted point: {SEED_CLAIM['id']} (UUID: {point_uuid})")
 
+    # Knowledge collection: create it, or bring an existing one up to the current
+    # quantization and payload index settings
+    ensure_qdrant_collection()
+    print("  Knowledge collection settings ensured")
+
     print("Qdrant seeding complete!")
 
 
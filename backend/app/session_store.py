@@ -0,0 +1,152 @@
+"""
+Stores for RAG conversation sessions.
+InMemorySessionStore is bounded by size and idle TTL - no external dependencies.
+RedisSessionStore shares sessions across workers (optional `redis` package).
+
+Both expose the same async API and must only be used from the event loop.
+"""
+
+import asyncio
+import time
+import weakref
+from collections import OrderedDict
+from typing import Optional
+
+import orjson
+
+
+class InMemorySessionStore:
+    """
+    In-memory session store with idle expiry and LRU eviction.
+
+    Sessions untouched for ttl_seconds are dropped, and once the store holds
+    max_sessions entries the least recently used session is evicted.
+
+    Usage:
+        store = InMemorySessionStore(max_sessions=10_000, ttl_seconds=3600)
+
+        async with store.lock(session_id):
+            session = await store.get(session_id)
+            ...
+    """
+
+    def __init__(self, max_sessions: int, ttl_seconds: int):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        # session_id -> (last access monotonic time, session), oldest first
+        self._sessions: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        # Locks live only while a request holds them
+        self._locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    async def get(self, session_id: str) -> Optional[dict]:
+        """Return the session and mark it recently used, or None if missing/expired."""
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+
+        now = time.monotonic()
+        last_access, session = entry
+        if now - last_access > self.ttl_seconds:
+            del self._sessions[session_id]
+            return None
+
+        self._sessions[session_id] = (now, session)
+        self._sessions.move_to_end(session_id)
+        return session
+
+    async def set(self, session_id: str, session: dict) -> None:
+        """Store a session, evicting expired and least recently used entries as needed."""
+        self._sessions[session_id] = (time.monotonic(), session)
+        self._sessions.move_to_end(session_id)
+        self._evict()
+
+    async def delete(self, session_id: str) -> None:
+        """Remove a session (no-op if missing)."""
+        self._sessions.pop(session_id, None)
+
+    async def close(self) -> None:
+        """Nothing to release for the in-memory store."""
+
+    def lock(self, session_id: str) -> asyncio.Lock:
+        """Per-session lock so concurrent requests on one session run in order."""
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[session_id] = lock
+        return lock
+
+    def _evict(self) -> None:
+        """Drop expired sessions from the old end, then trim to max_sessions."""
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._sessions:
+            oldest_id, (last_access, _) = next(iter(self._sessions.items()))
+            if last_access >= cutoff and len(self._sessions) <= self.max_sessions:
+                break
+            del self._sessions[oldest_id]
+
+
+class RedisSessionStore:
+    """
+    Redis-backed session store shared by all backend workers and restarts.
+
+    Sessions are stored as JSON with an idle TTL refreshed on every read and
+    write. Sessions returned by get() are copies: call set() after changing one.
+    lock() only orders requests within one worker process; route a session's
+    requests to one worker if strict cross-worker ordering matters.
+
+    Commands time out after timeout_seconds, so a stalled Redis fails requests
+    instead of hanging them.
+
+    Usage:
+        store = RedisSessionStore("redis://redis:6379/0", ttl_seconds=3600)
+    """
+
+    def __init__(
+        self,
+        url: str,
+        ttl_seconds: int,
+        key_prefix: str = "sanctum:rag_session:",
+        timeout_seconds: float = 2.0,
+    ):
+        # Optional dependency (redis>=5.0.1), only needed when Redis sessions are enabled
+        from redis import asyncio as redis_asyncio
+
+        self.ttl_seconds = ttl_seconds
+        self._key_prefix = key_prefix
+        self._redis = redis_asyncio.Redis.from_url(
+            url,
+            socket_timeout=timeout_seconds,
+            socket_connect_timeout=timeout_seconds,
+        )
+        self._locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+
+    async def get(self, session_id: str) -> Optional[dict]:
+        """Return the session and refresh its TTL, or None if missing/expired."""
+        raw = await self._redis.getex(self._key(session_id), ex=self.ttl_seconds)
+        return orjson.loads(raw) if raw else None
+
+    async def set(self, session_id: str, session: dict) -> None:
+        """Store a session with a fresh idle TTL."""
+        await self._redis.set(self._key(session_id), orjson.dumps(session), ex=self.ttl_seconds)
+
+    async def delete(self, session_id: str) -> None:
+        """Remove a session (no-op if missing)."""
+        await self._redis.delete(self._key(session_id))
+
+    async def close(self) -> None:
+        """Close the connection pool."""
+        await self._redis.aclose()
+
+    def lock(self, session_id: str) -> asyncio.Lock:
+        """Per-session lock so concurrent requests on one session (in this worker) run in order."""
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[session_id] = lock
+        return lock
+
+    def _key(self, session_id: str) -> str:
+        return f"{self._key_prefix}{session_id}"
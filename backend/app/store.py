@@ -4,13 +4,24 @@ Handles storing document chunks and embeddings to Qdrant.
 """
 
 import os
+import time
 import uuid
 import logging
 import asyncio
-from typing import Any
+from typing import Any, Optional
 
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+import numpy as np
+
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.models import (
+    Distance,
+    VectorParams,
+    PointStruct,
+    PayloadSchemaType,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+)
 
 # Configure logging
 logger = logging.getLogger("sanctum.store")
@@ -18,6 +29,9 @@ logger = logging.getLogger("sanctum.store")
 # Configuration
 QDRANT_HOST = os.getenv("QDRANT_HOST", "localhost")
 QDRANT_PORT = int(os.getenv("QDRANT_PORT", "6333"))
+QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+# Query-path searches use gRPC (protobuf vectors, one HTTP/2 connection) unless disabled
+QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "true").strip().lower() == "true"
 
 # =============================================================================
 # EMBEDDING CONFIGURATION
@@ -25,14 +39,39 @@ QDRANT_PORT = int(os.getenv("QDRANT_PORT", "6333"))
 # Embeddings run locally using sentence-transformers.
 # =============================================================================
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "intfloat/multilingual-e5-base")
+# "torch" (default) or "onnx" - ONNX Runtime needs sentence-transformers>=3.2
+# and optimum[onnxruntime] installed
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+# Optional ONNX file within the model repo, e.g. an int8 export such as
+# "onnx/model_qint8_avx512_vnni.onnx" (empty = the backend's default file)
+EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE", "")
 
 # Collection name for knowledge base
 COLLECTION_NAME = "sanctum_knowledge"
 
+# int8 scalar quantization kept in RAM: searches scan 4x fewer bytes, then rescore
+# the top candidates against the original float32 vectors, which new collections
+# keep on disk (on_disk=True) so RAM holds only the int8 copy
+QDRANT_QUANTIZATION_CONFIG = ScalarQuantization(
+    scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+)
+
 # Lazy-loaded resources
 _qdrant_client = None
+_async_qdrant_client = None
 _embedding_model = None
 
+# Quantization and job_id index checked once per process (ensure_qdrant_collection runs per chunk)
+_collection_settings_ensured = False
+
+# Bumped whenever this process writes to or deletes from the collection, so
+# query-side caches can tell their hits may be stale
+_index_version = 0
+
+# Collection points_count, shared by every worker/process: (checked monotonic time, count)
+INDEX_VERSION_CHECK_SECONDS = 5
+_points_count_checked: tuple[float, Optional[int]] = (float("-inf"), None)
+
 
 def get_qdrant_client():
     """Get or create Qdrant client"""
@@ -42,23 +81,88 @@ def get_qdrant_client():
     return _qdrant_client
 
 
+def get_async_qdrant_client() -> AsyncQdrantClient:
+    """Get or create the async Qdrant client used by the query path"""
+    global _async_qdrant_client
+    if _async_qdrant_client is None:
+        _async_qdrant_client = AsyncQdrantClient(
+            host=QDRANT_HOST,
+            port=QDRANT_PORT,
+            grpc_port=QDRANT_GRPC_PORT,
+            prefer_grpc=QDRANT_PREFER_GRPC,
+            timeout=30,
+        )
+    return _async_qdrant_client
+
+
+async def close_async_qdrant_client() -> None:
+    """Close the async Qdrant client (no-op if never created)"""
+    global _async_qdrant_client
+    if _async_qdrant_client is not None:
+        await _async_qdrant_client.close()
+        _async_qdrant_client = None
+
+
+async def get_index_version() -> tuple[int, Optional[int]]:
+    """
+    Version of the collection contents for cache scoping: (writes/deletes made by
+    this process, collection points_count or None if missing). points_count comes
+    from Qdrant, so ingests, deletes and wipes done by other workers or processes
+    show up within INDEX_VERSION_CHECK_SECONDS.
+    """
+    global _points_count_checked
+    checked_at, points_count = _points_count_checked
+    now = time.monotonic()
+    if now - checked_at >= INDEX_VERSION_CHECK_SECONDS:
+        try:
+            info = await get_async_qdrant_client().get_collection(COLLECTION_NAME)
+            points_count = info.points_count
+        except Exception:
+            points_count = None  # Collection missing (e.g. wiped) or Qdrant unreachable
+        _points_count_checked = (now, points_count)
+    return _index_version, points_count
+
+
+def invalidate_index() -> None:
+    """Mark cached search hits stale after changing or deleting collection data"""
+    global _index_version
+    _index_version += 1
+
+
 def get_embedding_model():
     """Get or create local embedding model (sentence-transformers)"""
     global _embedding_model
     if _embedding_model is None:
         from sentence_transformers import SentenceTransformer
-        _embedding_model = SentenceTransformer(EMBEDDING_MODEL)
+        if EMBEDDING_BACKEND == "torch":
+            _embedding_model = SentenceTransformer(EMBEDDING_MODEL)
+        else:
+            model_kwargs = {"file_name": EMBEDDING_ONNX_FILE} if EMBEDDING_ONNX_FILE else None
+            _embedding_model = SentenceTransformer(
+                EMBEDDING_MODEL,
+                backend=EMBEDDING_BACKEND,
+                model_kwargs=model_kwargs,
+            )
+        logger.info(f"Loaded embedding model {EMBEDDING_MODEL} (backend={EMBEDDING_BACKEND})")
     return _embedding_model
 
 
+def encode_texts(texts: list[str]) -> np.ndarray:
+    """
+    Embed a list of texts using the local sentence-transformers model.
+    Returns a float32 array with one row per text.
+    """
+    model = get_embedding_model()
+    embeddings = model.encode(texts, show_progress_bar=False, convert_to_numpy=True)
+    return embeddings.astype(np.float32, copy=False)
+
+
 def embed_texts(texts: list[str]) -> list[list[float]]:
     """
     Embed a list of texts using the local sentence-transformers model.
     Returns list of embedding vectors.
     """
-    model = get_embedding_model()
-    embeddings = model.encode(texts, show_progress_bar=False)
-    return [emb.tolist() for emb in embeddings]
+    return [emb.tolist() for emb in encode_texts(texts)]
 
 
 def get_embedding_dimension() -> int:
@@ -80,11 +184,32 @@ def ensure_qdrant_collection():
             collection_name=COLLECTION_NAME,
             vectors_config=VectorParams(
                 size=vector_dim,
-                distance=Distance.COSINE
-            )
+                distance=Distance.COSINE,
+                on_disk=True,
+            ),
+            quantization_config=QDRANT_QUANTIZATION_CONFIG,
         )
         logger.info(f"Created Qdrant collection: {COLLECTION_NAME} (dim={vector_dim})")
 
+    global _collection_settings_ensured
+    if not collection_exists or not _collection_settings_ensured:
+        # Collections created before quantization was introduced get it enabled in place
+        if collection_exists and client.get_collection(COLLECTION_NAME).config.quantization_config is None:
+            client.update_collection(
+                collection_name=COLLECTION_NAME,
+                quantization_config=QDRANT_QUANTIZATION_CONFIG,
+            )
+            logger.info(f"Enabled int8 quantization on Qdrant collection: {COLLECTION_NAME}")
+
+        # Index job_id so per-document access filters prune before scoring.
+        # Idempotent, so collections created before the index existed get it too.
+        client.create_payload_index(
+            collection_name=COLLECTION_NAME,
+            field_name="job_id",
+            field_schema=PayloadSchemaType.KEYWORD,
+        )
+        _collection_settings_ensured = True
+
 
 def _store_chunk_sync(
     chunk_id: str,
@@ -126,6 +251,7 @@ def _store_chunk_sync(
         points=[point]
     )
     qdrant_result["points_inserted"] = 1
+    invalidate_index()
 
     logger.info(f"[{chunk_id}] Chunk stored successfully")
     return {
@@ -214,5 +340,7 @@ async def delete_chunks_from_qdrant(job_id: str) -> int:
             break
         offset = next_offset
 
+    if deleted_count:
+        invalidate_index()
     logger.info(f"Deleted {deleted_count} total points from Qdrant for job {job_id}")
     return deleted_count
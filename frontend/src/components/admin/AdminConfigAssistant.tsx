@@ -41,17 +41,7 @@ function slugify(value: string): string {
 }
 
 function flattenDeploymentConfig(cfg: DeploymentConfigResponse): DeploymentConfigItem[] {
-  return [
-    ...cfg.llm,
-    ...cfg.embedding,
-    ...cfg.email,
-    ...cfg.storage,
-    ...cfg.security,
-    ...cfg.search,
-    ...cfg.domains,
-    ...cfg.ssl,
-    ...cfg.general,
-  ]
+  return Object.values(cfg.categories ?? {}).flat()
 }
 
 async function readErrorDetail(res: Response): Promise<string> {
@@ -245,8 +235,7 @@ export function AdminConfigAssistant() {
 
     lines.push('DEPLOYMENT CONFIG (/admin/deployment/config) [values are masked for secrets]')
     for (const category of Object.keys(configCategories)) {
-      const catKey = category as keyof DeploymentConfigResponse
-      const items = (deploymentCfg as any)[catKey] as DeploymentConfigItem[] | undefined
+      const items = deploymentCfg.categories?.[category]
       if (!items || items.length === 0) continue
       lines.push('')
       lines.push(`## ${category.toUpperCase()}`)
@@ -51,11 +51,7 @@ export function useAIConfig(userTypeId?: number | null) {
         setUserTypeConfig(data)
         // Pass the full user-type items directly to preserve is_override and override_user_type_id
         // This allows the UI to show override badges and revert actions
-        setConfig({
-          prompt_sections: data.prompt_sections,
-          parameters: data.parameters,
-          defaults: data.defaults,
-        })
+        setConfig({ categories: data.categories })
       } else {
         // Fetch global config
         const response = await adminFetch('/admin/ai-config')
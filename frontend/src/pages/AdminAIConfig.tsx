@@ -156,9 +156,9 @@ export function AdminAIConfig() {
     if (!editingKey) return
 
     // Find the config item to check its value_type
-    const item = aiConfig?.prompt_sections.find(i => i.key === editingKey)
-      || aiConfig?.parameters.find(i => i.key === editingKey)
-      || aiConfig?.defaults.find(i => i.key === editingKey)
+    const item = Object.values(aiConfig?.categories || {})
+      .flatMap(items => items ?? [])
+      .find(i => i.key === editingKey)
 
     // Validate JSON if applicable
     if (item?.value_type === 'json') {
@@ -597,7 +597,7 @@ export function AdminAIConfig() {
           </p>
 
           <div className="space-y-3">
-            {aiConfig?.prompt_sections.map(renderConfigItem)}
+            {aiConfig?.categories.prompt_sections?.map(renderConfigItem)}
           </div>
         </div>
 
@@ -622,7 +622,7 @@ export function AdminAIConfig() {
           </p>
 
           <div className="space-y-3">
-            {aiConfig?.parameters.map(renderConfigItem)}
+            {aiConfig?.categories.parameters?.map(renderConfigItem)}
           </div>
         </div>
 
@@ -640,7 +640,7 @@ export function AdminAIConfig() {
           </p>
 
           <div className="space-y-3">
-            {aiConfig?.defaults.map(renderConfigItem)}
+            {aiConfig?.categories.defaults?.map(renderConfigItem)}
           </div>
         </div>
 
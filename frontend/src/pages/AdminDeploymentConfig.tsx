@@ -169,7 +169,7 @@ export function AdminDeploymentConfig() {
       return { fingerprint: '', lastUpdatedAt: null as string | null }
     }
 
-    const items = Object.values(deploymentConfig).flat()
+    const items = Object.values(deploymentConfig.categories).flat()
     if (items.length === 0) {
       return { fingerprint: '', lastUpdatedAt: null as string | null }
     }
@@ -220,7 +220,7 @@ export function AdminDeploymentConfig() {
     if (!editingKey) return
 
     // Find the config item being edited
-    const item = Object.values(deploymentConfig || {})
+    const item = Object.values(deploymentConfig?.categories || {})
       .flat()
       .find((c) => c.key === editingKey)
 
@@ -921,17 +921,7 @@ export function AdminDeploymentConfig() {
   // Check if a config key is a secret (should be masked in audit log)
   const isSecretKey = (configKey: string): boolean => {
     if (!deploymentConfig) return false
-    const allConfigs = [
-      ...(deploymentConfig.llm || []),
-      ...(deploymentConfig.email || []),
-      ...(deploymentConfig.embedding || []),
-      ...(deploymentConfig.storage || []),
-      ...(deploymentConfig.security || []),
-      ...(deploymentConfig.search || []),
-      ...(deploymentConfig.domains || []),
-      ...(deploymentConfig.ssl || []),
-      ...(deploymentConfig.general || []),
-    ]
+    const allConfigs = Object.values(deploymentConfig.categories).flat()
     const configItem = allConfigs.find((c) => c.key === configKey)
     return configItem?.is_secret ?? false
   }
@@ -1536,15 +1526,15 @@ export function AdminDeploymentConfig() {
         {/* Configuration Categories */}
         {deploymentConfig && (
           <>
-            {renderCategory('llm', deploymentConfig.llm)}
-            {renderCategory('embedding', deploymentConfig.embedding)}
-            {renderCategory('email', deploymentConfig.email)}
-            {renderCategory('storage', deploymentConfig.storage)}
-            {renderCategory('search', deploymentConfig.search)}
-            {renderCategory('security', deploymentConfig.security)}
-            {renderCategory('domains', deploymentConfig.domains)}
-            {renderCategory('ssl', deploymentConfig.ssl)}
-            {renderCategory('general', deploymentConfig.general)}
+            {renderCategory('llm', deploymentConfig.categories.llm || [])}
+            {renderCategory('embedding', deploymentConfig.categories.embedding || [])}
+            {renderCategory('email', deploymentConfig.categories.email || [])}
+            {renderCategory('storage', deploymentConfig.categories.storage || [])}
+            {renderCategory('search', deploymentConfig.categories.search || [])}
+            {renderCategory('security', deploymentConfig.categories.security || [])}
+            {renderCategory('domains', deploymentConfig.categories.domains || [])}
+            {renderCategory('ssl', deploymentConfig.categories.ssl || [])}
+            {renderCategory('general', deploymentConfig.categories.general || [])}
           </>
         )}
 
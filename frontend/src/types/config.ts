@@ -15,10 +15,10 @@ export interface AIConfigItem {
   updated_at?: string
 }
 
+export type AIConfigGroup = 'prompt_sections' | 'parameters' | 'defaults'
+
 export interface AIConfigResponse {
-  prompt_sections: AIConfigItem[]
-  parameters: AIConfigItem[]
-  defaults: AIConfigItem[]
+  categories: Partial<Record<AIConfigGroup, AIConfigItem[]>>
 }
 
 // Type that allows config items with optional inheritance metadata
@@ -26,9 +26,7 @@ export interface AIConfigResponse {
 export type AIConfigItemWithOptionalInheritance = AIConfigItem | AIConfigWithInheritance
 
 export interface AIConfigResponseWithInheritance {
-  prompt_sections: AIConfigItemWithOptionalInheritance[]
-  parameters: AIConfigItemWithOptionalInheritance[]
-  defaults: AIConfigItemWithOptionalInheritance[]
+  categories: Partial<Record<AIConfigGroup, AIConfigItemWithOptionalInheritance[]>>
 }
 
 export interface AIConfigUpdate {
@@ -58,9 +56,7 @@ export interface AIConfigOverrideItem {
 export interface AIConfigUserTypeResponse {
   user_type_id: number
   user_type_name?: string
-  prompt_sections: AIConfigWithInheritance[]
-  parameters: AIConfigWithInheritance[]
-  defaults: AIConfigWithInheritance[]
+  categories: Partial<Record<AIConfigGroup, AIConfigWithInheritance[]>>
 }
 
 export interface AIConfigOverrideUpdate {
@@ -149,15 +145,8 @@ export interface DeploymentConfigItem {
 }
 
 export interface DeploymentConfigResponse {
-  llm: DeploymentConfigItem[]
-  embedding: DeploymentConfigItem[]
-  email: DeploymentConfigItem[]
-  storage: DeploymentConfigItem[]
-  security: DeploymentConfigItem[]
-  search: DeploymentConfigItem[]
-  domains: DeploymentConfigItem[]
-  ssl: DeploymentConfigItem[]
-  general: DeploymentConfigItem[]
+  // Keyed by category (llm, embedding, email, storage, security, search, domains, ssl, general)
+  categories: Record<string, DeploymentConfigItem[]>
 }
 
 export interface DeploymentConfigUpdate {
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test 2B: Structured Answer Fallback
+
+Verifies the structured-output answer path (RAG_STRUCTURED_OUTPUT) degrades
+to a plain completion when the provider's complete_json call raises:
+- Answer, clarifying questions and [SEARCH] tag come from tag parsing
+- facts_extracted is False, so background fact extraction still runs
+
+Runs in-process against backend/app with a fake LLM provider; no stack needed.
+
+Usage:
+    python test_2b_structured_answer_fallback.py [--api-base http://localhost:8000]
+
+Requirements:
+    - Backend Python dependencies (backend/requirements.txt)
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add backend to path for imports
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR.parent.parent.parent / "backend" / "app"))
+
+import query
+from llm.provider import LLMResponse
+
+
+FALLBACK_REPLY = (
+    "Here is what I found.\n"
+    "? Which city are you in?\n"
+    "[SEARCH: legal aid hotline]"
+)
+
+
+class FailingStructuredProvider:
+    """Fake provider whose structured call fails like a backend rejecting response_format."""
+
+    name = "fake"
+
+    def __init__(self):
+        self.complete_calls = 0
+
+    def complete_json(self, prompt, schema, model=None, temperature=0.1):
+        raise RuntimeError("400 Bad Request: response_format not supported")
+
+    def complete(self, prompt, model=None, temperature=0.1):
+        self.complete_calls += 1
+        return LLMResponse(content=FALLBACK_REPLY, model="fake-model", provider=self.name)
+
+
+def run_test() -> bool:
+    print("\n" + "=" * 60)
+    print("TEST 2B: Structured Answer Fallback")
+    print("=" * 60)
+
+    provider = FailingStructuredProvider()
+    original_get_provider = query.get_provider
+    query.get_provider = lambda: provider
+    try:
+        session = {"messages": [], "facts_gathered": {}}
+        answer, clarifying_questions, prompt, search_term, facts_extracted = query._call_llm_structured(
+            "Who can help me?", "(no context)", session,
+            prompt_sections={}, llm_params={},
+        )
+    except Exception as e:
+        print(f"[FAIL] _call_llm_structured raised: {type(e).__name__}: {e}")
+        return False
+    finally:
+        query.get_provider = original_get_provider
+
+    checks = [
+        ("plain completion used", provider.complete_calls == 1),
+        ("facts_extracted is False", facts_extracted is False),
+        ("answer parsed", answer.startswith("Here is what I found.") and "[SEARCH" not in answer),
+        ("search term parsed", search_term == "legal aid hotline"),
+        ("clarifying question parsed", clarifying_questions == ["Which city are you in?"]),
+        ("prompt returned", bool(prompt)),
+    ]
+
+    passed = True
+    for label, ok in checks:
+        print(f"  {label}: {'✓' if ok else '✗'}")
+        passed = passed and ok
+
+    print("\n" + "-" * 60)
+    print(f"TEST 2B RESULT: {'PASSED ✓' if passed else 'FAILED ✗'}")
+    print("-" * 60)
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test 2B: Structured Answer Fallback")
+    parser.add_argument("--api-base", default="http://localhost:8000", help="Unused; accepted for the test runner")
+    parser.parse_args()
+
+    passed = run_test()
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()